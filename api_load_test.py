@@ -0,0 +1,198 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import quote, urlsplit
+
+from bench import generate_flags
+from fake_roblox import fake_local_app_data
+from flag_model import FlagModel, get_settings_path
+from flag_query import QueryEngine
+from local_api import ApiServer, new_token, read_api_info, serve_forever
+from version_watcher import find_latest_player_version, get_versions_dir
+
+DEFAULT_CONNECTIONS = 16
+DEFAULT_DURATION = 5.0
+DEFAULT_WRITE_RATIO = 0.1
+DEFAULT_QUERY_RATIO = 0.0
+DEFAULT_BATCH_SIZE = 10
+DEFAULT_QUERY = "type:int value>1000"
+LOAD_TEST_PREFIX = "FIntApiLoadTest"
+
+
+class HttpConnection:
+    def __init__(self, host: str, port: int, token: Optional[str]):
+        self.host = host
+        self.port = port
+        self.token = token
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+    async def request(self, method: str, path: str, body: Any = None) -> Tuple[int, Any]:
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        auth = f"Authorization: Bearer {self.token}\r\n" if self.token else ""
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}:{self.port}\r\n{auth}Content-Length: {len(data)}\r\n\r\n"
+        self.writer.write(head.encode("latin-1") + data)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        return status, json.loads(await self.reader.readexactly(length)) if length else None
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+async def worker(index: int, connection: HttpConnection, keys: List[str], deadline: float, args: argparse.Namespace,
+                 timings: Dict[str, List[float]], errors: List[str], written: Set[str]):
+    rng = random.Random(index)
+    while time.perf_counter() < deadline:
+        roll = rng.random()
+        if roll < args.write_ratio:
+            kind, method, path = "batch", "POST", "/batch"
+            names = [f"{LOAD_TEST_PREFIX}{index}x{rng.randrange(args.batch_size * 4)}" for _ in range(args.batch_size)]
+            body = {"set": {name: rng.randint(0, 1_000_000) for name in names}}
+            written.update(names)
+        elif roll < args.write_ratio + args.query_ratio:
+            kind, method, path, body = "query", "GET", "/keys?q=" + quote(args.query), None
+        elif keys:
+            kind, method, path, body = "get", "GET", "/flags/" + quote(rng.choice(keys), safe=""), None
+        else:
+            kind, method, path, body = "status", "GET", "/status", None
+
+        start = time.perf_counter()
+        status, result = await connection.request(method, path, body)
+        timings.setdefault(kind, []).append(time.perf_counter() - start)
+        if status != 200:
+            errors.append(f"{kind} {status}: {result.get('error') if isinstance(result, dict) else result}")
+
+
+async def run_load(host: str, port: int, token: Optional[str], args: argparse.Namespace) -> Dict[str, Any]:
+    control = HttpConnection(host, port, token)
+    await control.open()
+    status, result = await control.request("GET", "/keys")
+    if status != 200:
+        raise RuntimeError(f"Could not list flags: {status} {result}")
+    keys = result["keys"]
+
+    connections = [HttpConnection(host, port, token) for _ in range(args.connections)]
+    await asyncio.gather(*(connection.open() for connection in connections))
+
+    timings: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    written: Set[str] = set()
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(worker(index, connection, keys, deadline, args, timings, errors, written)
+                           for index, connection in enumerate(connections)))
+    elapsed = time.perf_counter() - start
+
+    if written:
+        await control.request("POST", "/batch", {"remove": sorted(written)})
+    await asyncio.gather(*(connection.close() for connection in connections + [control]))
+
+    requests = sum(map(len, timings.values()))
+    report = {
+        "connections": args.connections, "seconds": elapsed, "requests": requests,
+        "requests_per_second": requests / elapsed, "errors": len(errors), "first_errors": errors[:5],
+        "operations": {},
+    }
+    for kind, values in sorted(timings.items()):
+        values.sort()
+        report["operations"][kind] = {
+            "count": len(values), "p50_ms": percentile(values, 0.5) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000, "p99_ms": percentile(values, 0.99) * 1000,
+        }
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{report['requests']} requests over {report['connections']} connection(s) in {report['seconds']:.2f}s: "
+        f"{report['requests_per_second']:.0f} req/s, {report['errors']} error(s)",
+        f"{'operation':<10} {'count':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+    ]
+    for kind, row in report["operations"].items():
+        lines.append(f"{kind:<10} {row['count']:>8} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}")
+    lines.extend(f"  {error}" for error in report["first_errors"])
+    return "\n".join(lines)
+
+
+def run_self_hosted(count: int, args: argparse.Namespace) -> Dict[str, Any]:
+    with fake_local_app_data("version-api-load", flags=generate_flags(count)):
+        settings_path = get_settings_path(find_latest_player_version(get_versions_dir()))
+        model = FlagModel()
+        model.load(settings_path)
+        server = ApiServer(model, token=new_token())
+        server.start()
+        stop = threading.Event()
+        host = threading.Thread(target=serve_forever,
+                                args=(server, QueryEngine(model), lambda: model.save(settings_path)),
+                                kwargs={"stop": stop}, daemon=True)
+        host.start()
+        try:
+            return asyncio.run(run_load(server.host, server.port, server.token, args))
+        finally:
+            stop.set()
+            host.join()
+            server.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure requests per second against the local API.")
+    parser.add_argument("--url", help="API address (default: read from the running editor's api.json)")
+    parser.add_argument("--token", help="API token (default: read from api.json)")
+    parser.add_argument("--self-host", type=int, metavar="FLAGS",
+                        help="start a throwaway server over this many generated flags instead of a running editor")
+    parser.add_argument("--connections", type=int, default=DEFAULT_CONNECTIONS, help="concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="seconds to run")
+    parser.add_argument("--write-ratio", type=float, default=DEFAULT_WRITE_RATIO, help="share of requests that are batches")
+    parser.add_argument("--query-ratio", type=float, default=DEFAULT_QUERY_RATIO, help="share of requests that are searches")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="flags set per batch request")
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="search used for query requests")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.self_host is not None:
+            report = run_self_hosted(args.self_host, args)
+        else:
+            info = read_api_info() or {}
+            url = args.url or info.get("url")
+            if not url:
+                print("error: no --url given and no running editor API found.", file=sys.stderr)
+                return 2
+            address = urlsplit(url)
+            report = asyncio.run(run_load(address.hostname, address.port, args.token or info.get("token"), args))
+    except (OSError, RuntimeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import json_codec
+from save_writer import write_atomic
+
+BACKUP_DIR_NAME = os.path.join("FastFlagEditor", "Backups")
+INDEX_FILE_NAME = "snapshots.jsonl"
+OBJECTS_DIR_NAME = "objects"
+MAX_DELTA_DEPTH = 32
+DELTA_MAX_FRACTION = 0.5
+CACHE_SIZE = 2
+COMPRESS_LEVEL = 6
+
+_MISSING = object()
+
+
+def get_backup_dir() -> Optional[str]:
+    local_app_data = os.environ.get("LOCALAPPDATA")
+    if not local_app_data:
+        return None
+    return os.path.join(local_app_data, BACKUP_DIR_NAME)
+
+
+def source_name(settings_path: str) -> str:
+    return os.path.basename(os.path.dirname(os.path.dirname(os.path.abspath(settings_path))))
+
+
+def content_digest(flags: Dict[str, Any]) -> str:
+    return hashlib.sha256(json_codec.dumps_compact(flags, sort_keys=True)).hexdigest()
+
+
+def _same(a: Any, b: Any) -> bool:
+    return type(a) is type(b) and a == b
+
+
+class Snapshot:
+    def __init__(self, snapshot_id: int, created: float, digest: str, reason: str, source: str, count: int):
+        self.id = snapshot_id
+        self.created = created
+        self.digest = digest
+        self.reason = reason
+        self.source = source
+        self.count = count
+
+    def to_record(self) -> Dict[str, Any]:
+        return {"id": self.id, "created": self.created, "digest": self.digest,
+                "reason": self.reason, "source": self.source, "count": self.count}
+
+    def describe(self) -> str:
+        created = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.created))
+        return f"#{self.id}  {created}  {self.reason:<8} {self.source}  ({self.count} flags)"
+
+
+class BackupStore:
+    def __init__(self, root: str):
+        self.root = root
+        self.objects_dir = os.path.join(root, OBJECTS_DIR_NAME)
+        self.index_path = os.path.join(root, INDEX_FILE_NAME)
+        self._lock = threading.RLock()
+        self._snapshots: Optional[List[Snapshot]] = None
+        self._by_id: Dict[int, Snapshot] = {}
+        self._torn = False
+        self._depths: Dict[str, int] = {}
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.snapshots())
+
+    def snapshots(self) -> List[Snapshot]:
+        with self._lock:
+            if self._snapshots is None:
+                self._read_index()
+            return list(self._snapshots)
+
+    def find(self, snapshot_id: int) -> Snapshot:
+        with self._lock:
+            if self._snapshots is None:
+                self._read_index()
+            snapshot = self._by_id.get(snapshot_id)
+        if snapshot is None:
+            raise ValueError(f"No backup #{snapshot_id}.")
+        return snapshot
+
+    def has_source(self, source: str) -> bool:
+        return any(snapshot.source == source for snapshot in self.snapshots())
+
+    def add(self, flags: Dict[str, Any], reason: str, source: str) -> Snapshot:
+        flags = dict(flags)
+        digest = content_digest(flags)
+        with self._lock:
+            if self._snapshots is None:
+                self._read_index()
+            if not os.path.exists(self._object_path(digest)):
+                self._write_object(digest, self._encode(flags, digest))
+
+            snapshot_id = self._snapshots[-1].id + 1 if self._snapshots else 1
+            snapshot = Snapshot(snapshot_id, time.time(), digest, reason, source, len(flags))
+            os.makedirs(self.root, exist_ok=True)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(("\n" if self._torn else "") + json.dumps(snapshot.to_record()) + "\n")
+            self._torn = False
+            self._snapshots.append(snapshot)
+            self._by_id[snapshot_id] = snapshot
+            self._remember(digest, flags)
+            return snapshot
+
+    def add_file(self, path: str, reason: str, source: str) -> Optional[Snapshot]:
+        with open(path, "rb") as f:
+            content = f.read()
+        if not content.strip():
+            return None
+        flags = json_codec.loads(content)
+        if not isinstance(flags, dict):
+            raise ValueError(f"{path} does not contain a JSON object.")
+        return self.add(flags, reason, source)
+
+    def load(self, snapshot_id: int) -> Dict[str, Any]:
+        return self.load_digest(self.find(snapshot_id).digest)
+
+    def load_digest(self, digest: str) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._reconstruct(digest))
+
+    def _reconstruct(self, digest: str) -> Dict[str, Any]:
+        cached = self._cache.get(digest)
+        if cached is not None:
+            self._cache.move_to_end(digest)
+            return cached
+
+        chain = []
+        current = digest
+        while current not in self._cache:
+            record = self._read_object(current)
+            self._depths[current] = record.get("depth", 0)
+            if "flags" in record:
+                flags = record["flags"]
+                break
+            chain.append((current, record))
+            current = record["base"]
+        else:
+            flags = dict(self._cache[current])
+
+        for current, record in reversed(chain):
+            for key in record["remove"]:
+                flags.pop(key, None)
+            flags.update(record["set"])
+        self._remember(digest, flags)
+        return flags
+
+    def _remember(self, digest: str, flags: Dict[str, Any]):
+        self._cache[digest] = flags
+        self._cache.move_to_end(digest)
+        while len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    def _encode(self, flags: Dict[str, Any], digest: str) -> Dict[str, Any]:
+        base = self._snapshots[-1].digest if self._snapshots else None
+        if base is None or base == digest:
+            return {"flags": flags}
+        try:
+            base_flags = self._reconstruct(base)
+            depth = self._depth(base) + 1
+        except (OSError, ValueError):
+            return {"flags": flags}
+
+        changes = {key: value for key, value in flags.items() if not _same(base_flags.get(key, _MISSING), value)}
+        removals = [key for key in base_flags if key not in flags]
+        if depth > MAX_DELTA_DEPTH or len(changes) + len(removals) > DELTA_MAX_FRACTION * len(flags):
+            return {"flags": flags}
+        return {"base": base, "depth": depth, "set": changes, "remove": removals}
+
+    def _depth(self, digest: str) -> int:
+        if digest not in self._depths:
+            self._depths[digest] = self._read_object(digest).get("depth", 0)
+        return self._depths[digest]
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def _write_object(self, digest: str, record: Dict[str, Any]):
+        path = self._object_path(digest)
+        write_atomic(path, zlib.compress(json_codec.dumps_compact(record), COMPRESS_LEVEL))
+        self._depths[digest] = record.get("depth", 0)
+
+    def _read_object(self, digest: str) -> Dict[str, Any]:
+        try:
+            with open(self._object_path(digest), "rb") as f:
+                return json_codec.loads(zlib.decompress(f.read()))
+        except zlib.error as e:
+            raise ValueError(f"Backup object {digest[:12]} is damaged: {e}")
+
+    def _read_index(self):
+        snapshots = []
+        line = ""
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        snapshots.append(Snapshot(record["id"], record["created"], record["digest"],
+                                                  record["reason"], record["source"], record["count"]))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        self._torn = bool(line) and not line.endswith("\n")
+        self._snapshots = snapshots
+        self._by_id = {snapshot.id: snapshot for snapshot in snapshots}
@@ -0,0 +1,230 @@
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+from fake_roblox import fake_local_app_data
+from flag_groups import GroupTree
+from flag_model import FlagModel, get_settings_path, parse_flags_json
+from flag_query import QueryEngine
+from json_codec import loads
+from lazy_flags import scan_flags
+from row_store import RowStore
+from type_engine import deduce_flag_types
+from save_writer import SaveWriter, serialize_flags, write_atomic
+from version_watcher import find_latest_player_version, get_versions_dir
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+DEFAULT_REPEAT = 3
+SEED = 1337
+VISIBLE_ROWS = 50
+
+PREFIXES = ("FFlag", "DFFlag", "FInt", "DFInt", "FString", "DFString", "FLog", "DFLog")
+WORDS = (
+    "Debug", "Graphics", "Render", "Network", "Physics", "Audio", "Lua", "Studio", "Client", "Server",
+    "Texture", "Shadow", "Lighting", "Mesh", "Cache", "Memory", "Thread", "Task", "Scheduler", "Frame",
+    "Rate", "Limit", "Prefer", "Vulkan", "D3D11", "Metal", "OpenGL", "Enable", "Disable", "Use",
+    "Async", "Streaming", "Terrain", "Voxel", "Particle", "Animation", "Camera", "Input", "Gui", "Text",
+    "Font", "Http", "Telemetry", "Report", "Crash", "Sample", "Percent", "Timeout", "Ms", "Size",
+)
+SEARCH_QUERIES = ("f", "fi", "fin", "fint", "fintr", "fintrender", "shadow", "vulkan", "zzzz", "")
+STRUCTURED_QUERIES = ("type:int value>1000", "/^DF(Int|Flag)/", "render -shadow", "value=true OR value=false", "NOT type:string")
+
+
+def generate_flags(count: int, seed: int = SEED) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    flags: Dict[str, Any] = {}
+    while len(flags) < count:
+        prefix = rng.choice(PREFIXES)
+        name = prefix + "".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5)))
+        if name in flags:
+            name += str(len(flags))
+        if prefix.endswith("Flag"):
+            value: Any = rng.choice(("True", "False", True, False))
+        elif prefix.endswith(("Int", "Log")):
+            value = rng.choice((str(rng.randint(-10, 100_000)), rng.randint(0, 1_000_000)))
+        else:
+            value = rng.choice(("", "https://example.com/endpoint", "Vulkan", "0", "en-us"))
+        flags[name] = value
+    return flags
+
+
+def measure(fn: Callable[[], Any], repeat: int) -> Tuple[float, int]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return statistics.median(timings), peak
+
+
+def run_size(count: int, repeat: int) -> List[Dict[str, Any]]:
+    flags = generate_flags(count)
+    text = json.dumps(flags, indent=2)
+    rows = []
+
+    with fake_local_app_data("version-bench", flags=flags) as root:
+        version_path = find_latest_player_version(get_versions_dir())
+        settings_path = get_settings_path(version_path)
+        import_path = os.path.join(root, "import.json")
+        with open(import_path, "w") as f:
+            f.write(text)
+
+        with open(settings_path, "rb") as f:
+            content = f.read()
+        loaded = FlagModel()
+        loaded.load(settings_path)
+        flag_types = deduce_flag_types(loaded.flags)
+        sample_tree = GroupTree(loaded.sorted_keys)
+        prefix = sample_tree.children[()][0]
+        expanded = ((prefix,), (prefix, sample_tree.children[(prefix,)][0]))
+        edit_key = next(iter(loaded.flags))
+        edited = dict(loaded.flags)
+        rewrite_path = os.path.join(root, "rewrite", "ClientAppSettings.json")
+        writer = SaveWriter()
+
+        def parse_json():
+            loads(content)
+
+        def scan_keys():
+            scan_flags(content)
+
+        def load():
+            FlagModel().load(settings_path)
+
+        def load_lazy():
+            model = FlagModel()
+            model.lazy_threshold = 0
+            model.load(settings_path)
+
+        def deduce():
+            deduce_flag_types(loaded.flags)
+
+        def build_rows():
+            rows = RowStore()
+            rows.rebuild(loaded.flags, flag_types)
+            rows.type_column()
+            filtered = SortedList(loaded.flags)
+            for key in filtered.islice(0, VISIBLE_ROWS):
+                rows.display_text(key, loaded.flags[key])
+
+        def build_groups():
+            GroupTree(loaded.sorted_keys, expanded).rows()
+
+        def filter_flags():
+            for query in SEARCH_QUERIES:
+                if query:
+                    SortedList(loaded.search_index.search(query))
+
+        def query_flags():
+            engine = QueryEngine(loaded)
+            for query in STRUCTURED_QUERIES:
+                SortedList(engine.search(query))
+
+        def import_merge():
+            model = FlagModel()
+            model.replace_flags(dict(loaded.flags))
+            with open(import_path) as f:
+                model.import_flags(parse_flags_json(f.read()), overwrite=False)
+
+        def import_overwrite():
+            model = FlagModel()
+            with open(import_path) as f:
+                model.import_flags(parse_flags_json(f.read()), overwrite=True)
+
+        def save():
+            write_atomic(settings_path, serialize_flags(dict(loaded.flags)))
+
+        def submit(path: str):
+            writer.submit(path, dict(edited))
+            writer.flush()
+            for result in writer.poll():
+                if result.error is not None:
+                    raise result.error
+
+        def save_edit():
+            edited[edit_key] = "0" if edited[edit_key] != "0" else "1"
+            submit(settings_path)
+
+        def save_unchanged():
+            submit(settings_path)
+
+        def save_rewrite():
+            if os.path.exists(rewrite_path):
+                os.unlink(rewrite_path)
+            submit(rewrite_path)
+
+        operations = (
+            ("parse_json", parse_json),
+            ("scan_keys", scan_keys),
+            ("load_flags", load),
+            ("load_flags_lazy", load_lazy),
+            ("deduce_type", deduce),
+            ("build_rows", build_rows),
+            ("build_groups", build_groups),
+            ("filter_flags", filter_flags),
+            ("query_flags", query_flags),
+            ("import_merge", import_merge),
+            ("import_overwrite", import_overwrite),
+            ("save_flags", save),
+            ("save_edit", save_edit),
+            ("save_unchanged", save_unchanged),
+            ("save_rewrite", save_rewrite),
+        )
+        try:
+            for name, fn in operations:
+                seconds, peak = measure(fn, repeat)
+                rows.append({"flags": count, "operation": name, "seconds": seconds, "peak_bytes": peak})
+        finally:
+            writer.stop()
+
+    return rows
+
+
+def format_rows(rows: List[Dict[str, Any]]) -> str:
+    lines = [f"{'flags':>9}  {'operation':<17} {'median ms':>11} {'per flag us':>12} {'peak MiB':>9}"]
+    for row in rows:
+        lines.append(
+            f"{row['flags']:>9}  {row['operation']:<17} {row['seconds'] * 1000:>11.2f} "
+            f"{row['seconds'] * 1e6 / row['flags']:>12.3f} {row['peak_bytes'] / (1024 * 1024):>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the flag model at scale.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="flag counts to generate (e.g. 1000 10000 100000 1000000)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed runs per operation")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    parser.add_argument("--output", help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    rows = []
+    for count in args.sizes:
+        print(f"benchmarking {count} flags...", file=sys.stderr)
+        rows.extend(run_size(count, max(1, args.repeat)))
+
+    report = json.dumps(rows, indent=2) if args.json else format_rows(rows)
+    print(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
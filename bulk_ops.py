@@ -0,0 +1,102 @@
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+
+from flag_model import FlagModel, convert_value, same_value, validate_value
+
+BULK_OPERATIONS = ["Set Value", "Toggle Bools", "Change Type", "Rename", "Delete"]
+
+
+class Batch:
+    def __init__(self):
+        self.updates: Dict[str, Tuple[Any, str]] = {}
+        self.removals: List[str] = []
+        self.skipped: List[str] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.updates or self.removals)
+
+
+def set_value_batch(model: FlagModel, keys: Iterable[str], flag_type: str, value_text: str) -> Batch:
+    if not validate_value(flag_type, value_text):
+        raise ValueError(f"Value '{value_text}' is not a valid {flag_type}.")
+    value = convert_value(flag_type, value_text)
+    batch = Batch()
+    for key in keys:
+        batch.updates[key] = value, flag_type
+    return batch
+
+
+def toggle_bools_batch(model: FlagModel, keys: Iterable[str]) -> Batch:
+    batch = Batch()
+    for key in keys:
+        value = model.flags[key]
+        if model.flag_type(key) != "bool":
+            batch.skipped.append(key)
+        elif isinstance(value, str):
+            batch.updates[key] = value.lower() != "true", "bool"
+        else:
+            batch.updates[key] = not value, "bool"
+    return batch
+
+
+def change_type_batch(model: FlagModel, keys: Iterable[str], flag_type: str) -> Batch:
+    batch = Batch()
+    for key in keys:
+        value = model.flags[key]
+        text = str(value).lower() if isinstance(value, bool) else str(value)
+        if validate_value(flag_type, text):
+            batch.updates[key] = convert_value(flag_type, text), flag_type
+        else:
+            batch.skipped.append(key)
+    return batch
+
+
+def rename_batch(model: FlagModel, keys: Iterable[str], pattern: str, replacement: str, use_regex: bool) -> Batch:
+    if not pattern:
+        raise ValueError("Rename pattern cannot be empty.")
+    compiled = re.compile(pattern) if use_regex else None
+
+    batch = Batch()
+    for key in keys:
+        if compiled is not None:
+            new_key = compiled.sub(replacement, key)
+        elif key.startswith(pattern):
+            new_key = replacement + key[len(pattern):]
+        else:
+            new_key = key
+
+        if new_key == key:
+            batch.skipped.append(key)
+            continue
+        if not new_key:
+            raise ValueError(f"Renaming '{key}' would leave it without a name.")
+        batch.removals.append(key)
+        if new_key in batch.updates:
+            raise ValueError(f"More than one flag would be renamed to '{new_key}'.")
+        batch.updates[new_key] = model.flags[key], model.flag_type(key)
+
+    removed = set(batch.removals)
+    for new_key in batch.updates:
+        if new_key in model.flags and new_key not in removed:
+            raise ValueError(f"A flag named '{new_key}' already exists.")
+    return batch
+
+
+def delete_batch(model: FlagModel, keys: Iterable[str]) -> Batch:
+    batch = Batch()
+    batch.removals = [key for key in keys if key in model.flags]
+    return batch
+
+
+def merge_batch(model: FlagModel, updates: Dict[str, Tuple[Any, str]], removals: Iterable[str] = ()) -> Batch:
+    batch = Batch()
+    flags = model.flags
+    batch.removals = [key for key in removals if key in flags and key not in updates]
+    for key, (value, flag_type) in updates.items():
+        if key not in flags or not same_value(flags[key], value) or model.flag_type(key) != flag_type:
+            batch.updates[key] = value, flag_type
+    return batch
+
+
+def replace_batch(model: FlagModel, target: Dict[str, Tuple[Any, str]]) -> Batch:
+    return merge_batch(model, target, [key for key in model.flags if key not in target])
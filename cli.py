@@ -0,0 +1,381 @@
+import argparse
+import json
+import sys
+from typing import TYPE_CHECKING, List, Optional
+
+from flag_model import (
+    FLAG_TYPE_OPTIONS, FlagModel, convert_value, diff_flags, get_settings_path, parse_flags_json,
+    validate_value,
+)
+from type_engine import coerce_flag
+from version_watcher import find_latest_player_version, get_versions_dir
+import fleet
+from flag_catalog import FlagCatalog
+
+if TYPE_CHECKING:
+    from backup_store import BackupStore
+
+COMMANDS = ("get", "set", "remove", "import", "export", "diff", "fleet", "catalog", "backups", "profiles", "serve", "compare")
+DEFAULT_BACKUP_LIST_LIMIT = 20
+
+
+class CliError(Exception):
+    pass
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="fast_flag_editor", description="Edit Roblox fast flags without the GUI.")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--settings", help="path to a ClientAppSettings.json to operate on")
+    target.add_argument("--version-path", help="Roblox version folder to operate on (default: latest installed)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    get_parser = commands.add_parser("get", help="print flag values as JSON")
+    get_parser.add_argument("keys", nargs="*", help="flags to print (default: all)")
+
+    set_parser = commands.add_parser("set", help="add or change a flag")
+    set_parser.add_argument("key")
+    set_parser.add_argument("value")
+    set_parser.add_argument("--type", choices=FLAG_TYPE_OPTIONS, help="value type (default: from the flag's prefix, then the value)")
+
+    remove_parser = commands.add_parser("remove", help="remove flags")
+    remove_parser.add_argument("keys", nargs="+")
+
+    import_parser = commands.add_parser("import", help="merge flags from a JSON file ('-' for stdin)")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--overwrite", action="store_true", help="replace all flags instead of merging")
+
+    export_parser = commands.add_parser("export", help="write flags as JSON")
+    export_parser.add_argument("file", nargs="?", default="-", help="output file (default: stdout)")
+
+    diff_parser = commands.add_parser("diff", help="compare flags with a JSON file")
+    diff_parser.add_argument("file")
+
+    fleet_parser = commands.add_parser("fleet", help="apply a flag file to many LOCALAPPDATA roots")
+    fleet_parser.add_argument("file", help="JSON flag file to apply ('-' for stdin)")
+    fleet_parser.add_argument("roots", nargs="+", help="LOCALAPPDATA roots or glob patterns")
+    fleet_parser.add_argument("--overwrite", action="store_true", help="replace all flags instead of merging")
+    fleet_parser.add_argument("--dry-run", action="store_true", help="only print what would change")
+    fleet_parser.add_argument("--no-verify", action="store_true", help="skip re-reading files after writing")
+    fleet_parser.add_argument("--workers", type=int, default=fleet.DEFAULT_WORKERS, help="parallel roots")
+    fleet_parser.add_argument("-v", "--verbose", action="store_true", help="print the per-flag diff for every root")
+
+    catalog_parser = commands.add_parser("catalog", help="compile a known-flags catalog and look names up in it")
+    catalog_parser.add_argument("source", help="catalog source (JSON object/list or name=default lines)")
+    catalog_parser.add_argument("query", nargs="?", help="name prefix or fuzzy query to look up")
+
+    backups_parser = commands.add_parser("backups", help="list, diff or restore backups of the settings")
+    backups_parser.add_argument("action", choices=("list", "diff", "restore"))
+    backups_parser.add_argument("ids", nargs="*", type=int,
+                                help="backup ids (diff: one to compare with the current flags or two to compare backups)")
+    backups_parser.add_argument("--limit", type=int, default=DEFAULT_BACKUP_LIST_LIMIT,
+                                help="newest backups to list, 0 for all")
+
+    profiles_parser = commands.add_parser("profiles", help="save named flag sets and switch between them")
+    profiles_parser.add_argument("action", choices=("list", "show", "save", "switch", "rename", "delete"))
+    profiles_parser.add_argument("names", nargs="*", help="profile name (rename: old and new name)")
+    profiles_parser.add_argument("--dry-run", action="store_true", help="switch: only print what would change")
+
+    compare_parser = commands.add_parser("compare", help="compare two flag files or Roblox version folders")
+    compare_parser.add_argument("left", help="JSON file or version folder")
+    compare_parser.add_argument("right", nargs="?", help="JSON file or version folder (default: the current settings)")
+    compare_parser.add_argument("--summary", action="store_true", help="only print how many flags differ")
+
+    serve_parser = commands.add_parser("serve", help="serve the local API for the settings file without the window")
+    serve_parser.add_argument("--port", type=int, default=0, help="port on 127.0.0.1 (default: any free port)")
+    serve_parser.add_argument("--save-delay", type=float,
+                              help="seconds to collect changes before writing the file (default: 1)")
+
+    return parser
+
+
+def resolve_settings_path(args: argparse.Namespace) -> str:
+    if args.settings:
+        return args.settings
+    version_path = args.version_path or find_latest_player_version(get_versions_dir())
+    if not version_path:
+        raise CliError("Could not find Roblox version folder.")
+    return get_settings_path(version_path)
+
+
+def read_text(path: str) -> str:
+    if path == "-":
+        return sys.stdin.read()
+    with open(path, "r") as f:
+        return f.read()
+
+
+def write_text(path: str, text: str):
+    if path == "-":
+        sys.stdout.write(text + "\n")
+        return
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def run_fleet(args: argparse.Namespace) -> int:
+    roots = fleet.expand_roots(args.roots)
+    if not roots:
+        raise CliError("No matching roots.")
+
+    entries = parse_flags_json(read_text(args.file))
+    report = fleet.apply_to_roots(
+        roots, entries, overwrite=args.overwrite, dry_run=args.dry_run,
+        verify=not args.no_verify, workers=args.workers,
+    )
+
+    for result in report.results:
+        detail = result.error or f"{len(result.diff)} change(s)"
+        print(f"{result.status:<10} {result.root}  {detail}  ({result.elapsed * 1000:.1f} ms)")
+        if args.verbose or args.dry_run:
+            for line in result.diff:
+                print(f"    {line}")
+
+    print(
+        f"{len(report.results)} root(s) in {report.elapsed:.3f}s "
+        f"({report.roots_per_second:.1f} roots/s, {report.flags_per_second:.1f} flag changes/s): "
+        f"{report.count('applied')} applied, {report.count('unchanged')} unchanged, "
+        f"{report.count('dry-run')} dry-run, {report.count('no-install')} without Roblox, "
+        f"{report.count('error')} failed",
+        file=sys.stderr,
+    )
+    return 1 if report.count("error") else 0
+
+
+def open_backups() -> "BackupStore":
+    from backup_store import BackupStore, get_backup_dir
+
+    backup_dir = get_backup_dir()
+    if not backup_dir:
+        raise CliError("LOCALAPPDATA is not set, so there is no backup folder.")
+    return BackupStore(backup_dir)
+
+
+def record_backup(model: FlagModel, settings_path: str, reason: str):
+    from backup_store import BackupStore, get_backup_dir, source_name
+
+    backup_dir = get_backup_dir()
+    if not backup_dir or not model.flags_enabled:
+        return
+    try:
+        BackupStore(backup_dir).add(model.flags, reason, source_name(settings_path))
+    except (OSError, ValueError) as e:
+        print(f"warning: could not back up the saved flags: {e}", file=sys.stderr)
+
+
+def run_backups(args: argparse.Namespace) -> int:
+    store = open_backups()
+    if args.action == "list":
+        snapshots = store.snapshots()
+        if args.limit:
+            snapshots = snapshots[-args.limit:]
+        for snapshot in reversed(snapshots):
+            print(snapshot.describe())
+        return 0
+
+    wanted = (1, 2) if args.action == "diff" else (1,)
+    if len(args.ids) not in wanted:
+        raise CliError(f"backups {args.action} takes {' or '.join(map(str, wanted))} backup id(s).")
+
+    if args.action == "diff" and len(args.ids) == 2:
+        lines = diff_flags(store.load(args.ids[0]), store.load(args.ids[1]))
+    else:
+        settings_path = resolve_settings_path(args)
+        model = FlagModel()
+        model.load(settings_path)
+        flags = store.load(args.ids[0])
+        if args.action == "diff":
+            lines = diff_flags(model.flags, flags)
+        else:
+            model.replace_flags(flags)
+            model.flags_enabled = True
+            model.save(settings_path)
+            record_backup(model, settings_path, "restore")
+            print(f"Restored backup #{args.ids[0]} ({len(flags)} flag(s)).", file=sys.stderr)
+            return 0
+
+    for line in lines:
+        print(line)
+    return 1 if lines else 0
+
+
+def run_profiles(args: argparse.Namespace) -> int:
+    import sqlite3
+    from bulk_ops import replace_batch
+    from profile_store import ProfileStore, get_profile_db_path
+
+    profile_path = get_profile_db_path()
+    if not profile_path:
+        raise CliError("LOCALAPPDATA is not set, so there is no profile store.")
+    store = ProfileStore(profile_path)
+    try:
+        if args.action == "list":
+            for profile in store.profiles():
+                print(profile.describe())
+            return 0
+
+        wanted = 2 if args.action == "rename" else 1
+        if len(args.names) != wanted:
+            raise CliError(f"profiles {args.action} takes {wanted} name(s).")
+        name = args.names[0]
+
+        if args.action == "show":
+            print(json.dumps(dict(sorted(store.load(name).items())), indent=2))
+            return 0
+        if args.action == "rename":
+            store.rename(name, args.names[1])
+            return 0
+        if args.action == "delete":
+            store.delete(name)
+            return 0
+
+        settings_path = resolve_settings_path(args)
+        model = FlagModel()
+        model.load(settings_path)
+        if args.action == "save":
+            profile, changed = store.save_model(name, model)
+            print(f"Saved profile '{profile.name}' ({profile.count} flag(s), {changed} change(s)).", file=sys.stderr)
+            return 0
+
+        batch = replace_batch(model, store.entries(name))
+        if args.dry_run:
+            for line in diff_flags(model.flags, store.load(name)):
+                print(line)
+            return 0
+        model.apply_batch(batch.updates, batch.removals)
+        model.flags_enabled = True
+        model.save(settings_path)
+        record_backup(model, settings_path, "profile")
+        print(f"Switched to '{name}' ({len(batch.updates)} set, {len(batch.removals)} removed).", file=sys.stderr)
+        return 0
+    except sqlite3.Error as e:
+        raise CliError(f"Profile store error: {e}")
+    finally:
+        store.close()
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    from flag_query import QueryEngine
+    from local_api import SAVE_DELAY, ApiServer, new_token, serve_forever
+
+    settings_path = resolve_settings_path(args)
+    model = FlagModel()
+    model.load(settings_path)
+
+    def save():
+        model.save(settings_path)
+        record_backup(model, settings_path, "api")
+
+    server = ApiServer(model, port=args.port, token=new_token())
+    server.start()
+    try:
+        info_path = server.write_info()
+        print(f"Serving {settings_path} on {server.url}", file=sys.stderr)
+        if info_path:
+            print(f"URL and token written to {info_path}", file=sys.stderr)
+        else:
+            print(f"Token: {server.token}", file=sys.stderr)
+        serve_forever(server, QueryEngine(model), save, SAVE_DELAY if args.save_delay is None else args.save_delay)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+def run_compare(args: argparse.Namespace) -> int:
+    from flag_compare import CompareSource, FlagDiff
+
+    right_path = args.right or resolve_settings_path(args)
+    diff = FlagDiff(CompareSource(args.left, args.left).load(), CompareSource(right_path, right_path).load())
+    if args.summary:
+        print(f"{len(diff.added)} added, {len(diff.removed)} removed, {len(diff.changed)} changed")
+    else:
+        for line in diff.lines():
+            print(line)
+    return 1 if len(diff) else 0
+
+
+def run(args: argparse.Namespace) -> int:
+    if args.command == "fleet":
+        return run_fleet(args)
+
+    if args.command == "backups":
+        return run_backups(args)
+
+    if args.command == "profiles":
+        return run_profiles(args)
+
+    if args.command == "serve":
+        return run_serve(args)
+
+    if args.command == "compare":
+        return run_compare(args)
+
+    if args.command == "catalog":
+        catalog = FlagCatalog(args.source)
+        print(f"{len(catalog)} flag(s) in {catalog.path}", file=sys.stderr)
+        if args.query:
+            for name, flag_type, default in catalog.suggest(args.query):
+                print(f"{name}\t{flag_type}\t{default}")
+        catalog.close()
+        return 0
+
+    settings_path = resolve_settings_path(args)
+    model = FlagModel()
+    model.load(settings_path)
+
+    if args.command == "get":
+        missing = [key for key in args.keys if key not in model.flags]
+        if missing:
+            raise CliError(f"Unknown flag(s): {', '.join(missing)}")
+        keys = args.keys or model.sorted_keys
+        print(json.dumps({key: model.flags[key] for key in keys}, indent=2))
+        return 0
+
+    if args.command == "export":
+        write_text(args.file, json.dumps(model.flags, indent=2))
+        return 0
+
+    if args.command == "diff":
+        other = json.loads(read_text(args.file) or "{}")
+        if not isinstance(other, dict):
+            raise CliError(f"{args.file} does not contain a JSON object.")
+        lines = diff_flags(model.flags, other)
+        for line in lines:
+            print(line)
+        return 1 if lines else 0
+
+    if args.command == "set":
+        if args.type:
+            if not validate_value(args.type, args.value):
+                raise CliError(f"Value '{args.value}' is not a valid {args.type}.")
+            model.set_flag(args.key, convert_value(args.type, args.value), args.type)
+        else:
+            model.set_flag(args.key, *coerce_flag(args.key, args.value))
+    elif args.command == "remove":
+        missing = [key for key in args.keys if not model.remove_flag(key)]
+        if missing:
+            print(f"Not found: {', '.join(missing)}", file=sys.stderr)
+    elif args.command == "import":
+        imported = parse_flags_json(read_text(args.file))
+        model.import_flags(imported, args.overwrite)
+        print(f"{'Overwritten' if args.overwrite else 'Merged'} {len(imported)} flag(s).", file=sys.stderr)
+
+    model.flags_enabled = True
+    model.save(settings_path)
+    record_backup(model, settings_path, "cli")
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return run(args)
+    except (CliError, OSError, ValueError, TypeError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
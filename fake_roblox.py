@@ -0,0 +1,56 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from version_watcher import PLAYER_EXECUTABLE
+
+
+def add_version(local_app_data: str, name: str, with_player: bool = True,
+                flags: Optional[Dict[str, Any]] = None, mtime: Optional[float] = None) -> str:
+    version_path = os.path.join(local_app_data, "Roblox", "Versions", name)
+    os.makedirs(version_path, exist_ok=True)
+
+    if with_player:
+        with open(os.path.join(version_path, PLAYER_EXECUTABLE), "wb"):
+            pass
+
+    if flags is not None:
+        write_settings(version_path, flags)
+
+    if mtime is None:
+        mtime = time.time()
+    os.utime(version_path, (mtime, mtime))
+    return version_path
+
+
+def write_settings(version_path: str, flags: Dict[str, Any]) -> str:
+    settings_dir = os.path.join(version_path, "ClientSettings")
+    os.makedirs(settings_dir, exist_ok=True)
+    settings_path = os.path.join(settings_dir, "ClientAppSettings.json")
+    with open(settings_path, "w") as f:
+        json.dump(flags, f, indent=2)
+    return settings_path
+
+
+@contextmanager
+def fake_local_app_data(*versions: str, flags: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    root = tempfile.mkdtemp(prefix="fast_flag_editor_")
+    previous = os.environ.get("LOCALAPPDATA")
+    os.environ["LOCALAPPDATA"] = root
+    try:
+        os.makedirs(os.path.join(root, "Roblox", "Versions"), exist_ok=True)
+        base_time = time.time() - len(versions)
+        for offset, name in enumerate(versions):
+            add_version(root, name, flags=flags if offset == len(versions) - 1 else None,
+                        mtime=base_time + offset)
+        yield root
+    finally:
+        if previous is None:
+            os.environ.pop("LOCALAPPDATA", None)
+        else:
+            os.environ["LOCALAPPDATA"] = previous
+        shutil.rmtree(root, ignore_errors=True)
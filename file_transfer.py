@@ -0,0 +1,146 @@
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from json_codec import dumps_value, scan_object
+from save_writer import write_atomic_chunks
+from type_engine import coerce_flag
+
+CHUNK_SIZE = 1024 * 1024
+READ_SHARE = 0.3
+PROGRESS_INTERVAL = 2000
+EXPORT_BATCH = 2000
+
+
+class TransferCancelled(Exception):
+    pass
+
+
+class TransferJob:
+    def __init__(self, kind: str, path: str, on_complete: Optional[Callable[[], None]] = None):
+        self.kind = kind
+        self.path = path
+        self.on_complete = on_complete
+        self.overwrite = False
+        self.progress = 0.0
+        self.flags: Optional[Dict[str, Tuple[Any, str]]] = None
+        self.text: Optional[str] = None
+        self.count = 0
+        self.error: Optional[Exception] = None
+        self.elapsed = 0.0
+        self._cancel = threading.Event()
+        self._done = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    @property
+    def ok(self) -> bool:
+        return self.finished and self.error is None
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def step(self, progress: float):
+        if self._cancel.is_set():
+            raise TransferCancelled()
+        self.progress = progress
+
+    def start(self, target: Callable[..., None], *args: Any) -> "TransferJob":
+        threading.Thread(target=self._run, args=(target,) + args, name=f"Transfer-{self.kind}", daemon=True).start()
+        return self
+
+    def _run(self, target: Callable[..., None], *args: Any):
+        start = time.perf_counter()
+        try:
+            target(self, *args)
+            self.progress = 1.0
+        except Exception as e:
+            self.error = e
+        finally:
+            self.elapsed = time.perf_counter() - start
+            self._done.set()
+            if self.on_complete:
+                self.on_complete()
+
+
+def parse_flags_stream(text: str, step: Callable[[float], None] = lambda progress: None) -> Dict[str, Tuple[Any, str]]:
+    flags: Dict[str, Tuple[Any, str]] = {}
+    for key, value, span in scan_object(text):
+        flags[key] = coerce_flag(key, value)
+        if len(flags) % PROGRESS_INTERVAL == 0:
+            step(span[3] / len(text))
+    return flags
+
+
+def iter_flags_json(flags: Dict[str, Any], step: Callable[[float], None] = lambda progress: None) -> Iterator[bytes]:
+    if not flags:
+        yield b"{}"
+        return
+
+    total = len(flags)
+    lines = []
+    written = 0
+    yield b"{\n"
+    for key, value in flags.items():
+        lines.append(f"  {dumps_value(key)}: {dumps_value(value)}")
+        if len(lines) == EXPORT_BATCH:
+            written += len(lines)
+            yield (",\n".join(lines) + (",\n" if written < total else "")).encode("utf-8")
+            lines = []
+            step(written / total)
+    if lines:
+        yield ",\n".join(lines).encode("utf-8")
+    yield b"\n}"
+
+
+def _import_file(job: TransferJob):
+    size = max(1, os.path.getsize(job.path))
+    chunks = []
+    read = 0
+    with open(job.path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            chunks.append(chunk)
+            read += len(chunk)
+            job.step(READ_SHARE * read / size)
+
+    text = b"".join(chunks).decode("utf-8-sig")
+    del chunks
+    job.flags = parse_flags_stream(text, lambda progress: job.step(READ_SHARE + (1 - READ_SHARE) * progress))
+    job.count = len(job.flags)
+
+
+def _export_file(job: TransferJob, flags: Dict[str, Any]):
+    write_atomic_chunks(job.path, iter_flags_json(flags, job.step))
+    job.count = len(flags)
+
+
+def _export_text(job: TransferJob, flags: Dict[str, Any]):
+    job.text = b"".join(iter_flags_json(flags, job.step)).decode("utf-8")
+    job.count = len(flags)
+
+
+def start_import(path: str, overwrite: bool, on_complete: Optional[Callable[[], None]] = None) -> TransferJob:
+    job = TransferJob("import", os.path.abspath(path), on_complete)
+    job.overwrite = overwrite
+    return job.start(_import_file)
+
+
+def start_export(path: str, flags: Dict[str, Any], on_complete: Optional[Callable[[], None]] = None) -> TransferJob:
+    return TransferJob("export", os.path.abspath(path), on_complete).start(_export_file, flags)
+
+
+def start_export_text(flags: Dict[str, Any], on_complete: Optional[Callable[[], None]] = None) -> TransferJob:
+    return TransferJob("preview", "", on_complete).start(_export_text, flags)
@@ -0,0 +1,217 @@
+import json
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from typing import Any, Iterable, List, Optional, Tuple
+
+from type_engine import TYPE_NAMES, deduce_flag_type, prefix_type
+
+CATALOG_MAGIC = b"FFCAT001"
+CATALOG_SUFFIX = ".ffcat"
+HEADER = struct.Struct("<8sI")
+OFFSET = struct.Struct("<I")
+RECORD_HEAD = struct.Struct("<HBH")
+SUGGESTION_LIMIT = 12
+FUZZY_SCAN_LIMIT = 50_000
+FUZZY_MIN_ANCHOR = 3
+ROBLOX_PREFIXES = (b"fflag", b"dfflag", b"sfflag", b"fint", b"dfint", b"flog", b"dflog", b"fstring", b"dfstring")
+
+CatalogEntry = Tuple[str, str, str]
+
+
+def _default_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _entry_type(name: str, default: Any, flag_type: Optional[str] = None) -> str:
+    if flag_type:
+        return flag_type
+    if default is None or default == "":
+        return prefix_type(name) or "string"
+    return deduce_flag_type(name, default)
+
+
+def read_catalog_source(path: str) -> List[CatalogEntry]:
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read()
+
+    entries: List[CatalogEntry] = []
+    if text.lstrip().startswith(("{", "[")):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            items: Iterable[Tuple[str, Any, Optional[str]]] = ((name, value, None) for name, value in data.items())
+        else:
+            items = ((item["name"], item.get("default"), item.get("type")) for item in data)
+        for name, default, flag_type in items:
+            entries.append((name, _entry_type(name, default, flag_type), _default_text(default)))
+        return entries
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        name, _, default = line.partition("=")
+        name, default = name.strip(), default.strip()
+        entries.append((name, _entry_type(name, default), default))
+    return entries
+
+
+def build_catalog(entries: Iterable[CatalogEntry], output_path: str) -> int:
+    unique = {}
+    for name, flag_type, default in entries:
+        unique.setdefault(name.lower(), (name, flag_type, default))
+    ordered = [unique[key] for key in sorted(unique)]
+
+    records = bytearray()
+    offsets = bytearray()
+    for name, flag_type, default in ordered:
+        name_bytes = name.encode("utf-8")
+        default_bytes = default.encode("utf-8")[:0xFFFF]
+        type_code = TYPE_NAMES.index(flag_type) if flag_type in TYPE_NAMES else TYPE_NAMES.index("string")
+        offsets += OFFSET.pack(len(records))
+        records += RECORD_HEAD.pack(len(name_bytes), type_code, len(default_bytes))
+        records += name_bytes
+        records += default_bytes
+
+    temp_path = output_path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(HEADER.pack(CATALOG_MAGIC, len(ordered)))
+        f.write(offsets)
+        f.write(records)
+    os.replace(temp_path, output_path)
+    return len(ordered)
+
+
+def compiled_catalog_path(source_path: str) -> str:
+    if source_path.endswith(CATALOG_SUFFIX):
+        return source_path
+    compiled_path = source_path + CATALOG_SUFFIX
+    if not os.path.exists(compiled_path) or os.path.getmtime(compiled_path) < os.path.getmtime(source_path):
+        build_catalog(read_catalog_source(source_path), compiled_path)
+    return compiled_path
+
+
+class _LowerNames:
+    def __init__(self, catalog: "FlagCatalog"):
+        self.catalog = catalog
+
+    def __len__(self) -> int:
+        return len(self.catalog)
+
+    def __getitem__(self, index: int) -> bytes:
+        return self.catalog.name_bytes_at(index).lower()
+
+
+class FlagCatalog:
+    def __init__(self, path: str):
+        self.path = compiled_catalog_path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{self.path} is empty.")
+
+        magic, self.count = HEADER.unpack_from(self._map, 0)
+        if magic != CATALOG_MAGIC:
+            self.close()
+            raise ValueError(f"{self.path} is not a flag catalog.")
+        self._offsets_start = HEADER.size
+        self._records_start = self._offsets_start + self.count * OFFSET.size
+        self._lower_names = _LowerNames(self)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record_offset(self, index: int) -> int:
+        return self._records_start + OFFSET.unpack_from(self._map, self._offsets_start + index * OFFSET.size)[0]
+
+    def name_bytes_at(self, index: int) -> bytes:
+        offset = self._record_offset(index)
+        name_length = RECORD_HEAD.unpack_from(self._map, offset)[0]
+        start = offset + RECORD_HEAD.size
+        return self._map[start:start + name_length]
+
+    def entry_at(self, index: int) -> CatalogEntry:
+        offset = self._record_offset(index)
+        name_length, type_code, default_length = RECORD_HEAD.unpack_from(self._map, offset)
+        start = offset + RECORD_HEAD.size
+        name = self._map[start:start + name_length].decode("utf-8")
+        default = self._map[start + name_length:start + name_length + default_length].decode("utf-8")
+        return name, TYPE_NAMES[type_code], default
+
+    def _lower_bound(self, key: bytes) -> int:
+        return bisect_left(self._lower_names, key)
+
+    def get(self, name: str) -> Optional[CatalogEntry]:
+        index = self._lower_bound(name.lower().encode("utf-8"))
+        if index < self.count:
+            entry = self.entry_at(index)
+            if entry[0].lower() == name.lower():
+                return entry
+        return None
+
+    def prefix(self, prefix: str, limit: int = SUGGESTION_LIMIT) -> List[CatalogEntry]:
+        key = prefix.lower().encode("utf-8")
+        results = []
+        index = self._lower_bound(key)
+        while index < self.count and len(results) < limit:
+            if not self.name_bytes_at(index).lower().startswith(key):
+                break
+            results.append(self.entry_at(index))
+            index += 1
+        return results
+
+    def fuzzy(self, query: str, limit: int = SUGGESTION_LIMIT) -> List[CatalogEntry]:
+        key = query.lower().encode("utf-8")
+        if not key:
+            return []
+
+        anchor = b""
+        for length in range(len(key), 0, -1):
+            index = self._lower_bound(key[:length])
+            if index < self.count and self.name_bytes_at(index).lower().startswith(key[:length]):
+                anchor = key[:length]
+                break
+        anchors = (anchor,) if len(anchor) >= FUZZY_MIN_ANCHOR else ROBLOX_PREFIXES + ((anchor,) if anchor else ())
+
+        results: List[CatalogEntry] = []
+        budget = FUZZY_SCAN_LIMIT
+        for anchor in anchors:
+            index = self._lower_bound(anchor)
+            while index < self.count and budget > 0:
+                name = self.name_bytes_at(index).lower()
+                if not name.startswith(anchor):
+                    break
+                if _is_subsequence(key, name[len(anchor):] if anchor in ROBLOX_PREFIXES else name):
+                    results.append(self.entry_at(index))
+                    if len(results) >= limit:
+                        return results
+                index += 1
+                budget -= 1
+        return results
+
+    def suggest(self, text: str, limit: int = SUGGESTION_LIMIT) -> List[CatalogEntry]:
+        results = self.prefix(text, limit)
+        if len(results) < limit:
+            seen = {entry[0] for entry in results}
+            results += [entry for entry in self.fuzzy(text, limit) if entry[0] not in seen][:limit - len(results)]
+        return results
+
+
+def _is_subsequence(needle: bytes, haystack: bytes) -> bool:
+    position = 0
+    for byte in needle:
+        position = haystack.find(byte, position) + 1
+        if position == 0:
+            return False
+    return True
@@ -0,0 +1,143 @@
+import json
+import os
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import json_codec
+from bulk_ops import Batch, merge_batch
+from file_transfer import TransferJob
+from flag_model import FlagModel, get_settings_path
+from type_engine import deduce_flag_type
+from version_watcher import PLAYER_EXECUTABLE
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+DIFF_KINDS = (ADDED, REMOVED, CHANGED)
+KIND_MARKS = {ADDED: "+", REMOVED: "-", CHANGED: "~"}
+TYPE_SENSITIVE = (bool, float)
+
+
+class CompareSource:
+    def __init__(self, label: str, path: Optional[str] = None, flags: Optional[Dict[str, Any]] = None,
+                 current: bool = False):
+        self.label = label
+        self.path = path
+        self.flags = flags
+        self.current = current
+
+    def load(self) -> Dict[str, Any]:
+        if self.flags is not None:
+            return self.flags if isinstance(self.flags, dict) else dict(self.flags)
+
+        path = self.path
+        if os.path.isdir(path):
+            path = get_settings_path(path)
+            if not os.path.exists(path):
+                return {}
+        with open(path, "rb") as f:
+            content = f.read()
+        flags = json_codec.loads(content) if content.strip() else {}
+        if not isinstance(flags, dict):
+            raise ValueError(f"{path} does not contain a JSON object.")
+        return flags
+
+
+def version_sources(versions_dir: Optional[str]) -> List[CompareSource]:
+    if not versions_dir or not os.path.isdir(versions_dir):
+        return []
+    folders = [os.path.join(versions_dir, name) for name in os.listdir(versions_dir)]
+    folders = [folder for folder in folders if os.path.exists(os.path.join(folder, PLAYER_EXECUTABLE))]
+    folders.sort(key=os.path.getmtime, reverse=True)
+    return [CompareSource(f"Version {os.path.basename(folder)}", folder) for folder in folders]
+
+
+class FlagDiff:
+    def __init__(self, left: Dict[str, Any], right: Dict[str, Any]):
+        self.left = left
+        self.right = right
+        left_keys, right_keys = left.keys(), right.keys()
+        self.added: Set[str] = right_keys - left_keys
+        self.removed: Set[str] = left_keys - right_keys
+        self.changed: Set[str] = self._changed(left_keys & right_keys)
+        self.keys: List[str] = sorted(self.added | self.removed | self.changed)
+        self._filtered: Dict[Tuple[str, ...], List[str]] = {}
+
+    def _changed(self, common: Set[str]) -> Set[str]:
+        left, right = self.left, self.right
+        try:
+            delta = left.items() ^ right.items()
+        except TypeError:
+            return {key for key in common if type(left[key]) is not type(right[key]) or left[key] != right[key]}
+
+        changed = {key for key, _ in delta}
+        changed &= common
+        sensitive = {key for key, value in left.items() if type(value) in TYPE_SENSITIVE}
+        sensitive |= {key for key, value in right.items() if type(value) in TYPE_SENSITIVE}
+        sensitive &= common
+        sensitive -= changed
+        changed.update(key for key in sensitive if type(left[key]) is not type(right[key]))
+        return changed
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def kind(self, key: str) -> str:
+        if key in self.added:
+            return ADDED
+        if key in self.removed:
+            return REMOVED
+        return CHANGED
+
+    def filtered(self, kinds: Iterable[str]) -> List[str]:
+        kinds = tuple(kind for kind in DIFF_KINDS if kind in kinds)
+        if len(kinds) == len(DIFF_KINDS):
+            return self.keys
+        keys = self._filtered.get(kinds)
+        if keys is None:
+            keys = self._filtered[kinds] = [key for key in self.keys if self.kind(key) in kinds]
+        return keys
+
+    def lines(self, keys: Optional[Iterable[str]] = None) -> Iterator[str]:
+        for key in self.keys if keys is None else keys:
+            kind = self.kind(key)
+            if kind == ADDED:
+                yield f"+ {key}: {json.dumps(self.right[key])}"
+            elif kind == REMOVED:
+                yield f"- {key}: {json.dumps(self.left[key])}"
+            else:
+                yield f"~ {key}: {json.dumps(self.left[key])} -> {json.dumps(self.right[key])}"
+
+    def batch(self, model: FlagModel, keys: Iterable[str], from_left: bool = False) -> Batch:
+        source = self.left if from_left else self.right
+        updates = {}
+        removals = []
+        for key in keys:
+            if key in source:
+                value = source[key]
+                updates[key] = value, deduce_flag_type(key, value)
+            else:
+                removals.append(key)
+        return merge_batch(model, updates, removals)
+
+
+class CompareJob(TransferJob):
+    def __init__(self, left: CompareSource, right: CompareSource, on_complete: Optional[Callable[[], None]] = None):
+        super().__init__("compare", f"{left.label} / {right.label}", on_complete)
+        self.left = left
+        self.right = right
+        self.diff: Optional[FlagDiff] = None
+
+
+def _compare(job: CompareJob):
+    left = job.left.load()
+    job.step(0.4)
+    right = job.right.load()
+    job.step(0.8)
+    job.diff = FlagDiff(left, right)
+    job.count = len(job.diff)
+
+
+def start_compare(left: CompareSource, right: CompareSource, on_complete: Optional[Callable[[], None]] = None) -> CompareJob:
+    job = CompareJob(left, right, on_complete)
+    job.start(_compare)
+    return job
@@ -0,0 +1,130 @@
+import re
+from collections import Counter
+from itertools import takewhile
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sortedcontainers import SortedList
+
+from type_engine import PREFIX_PATTERN
+
+OTHER_GROUP_LABEL = "Other"
+EMPTY_SEGMENT_LABEL = "(no name)"
+
+GROUP_PATTERN = re.compile(r"(?P<prefix>(?:" + PREFIX_PATTERN.pattern + r")?)(?P<segment>[A-Z]?[a-z0-9]+|[A-Z]+(?![a-z])|.?)")
+
+GroupPath = Tuple[str, ...]
+GroupRow = Tuple[int, GroupPath, Optional[str]]
+
+
+def group_of(key: str) -> Tuple[str, str]:
+    return GROUP_PATTERN.match(key).group("prefix", "segment")
+
+
+class GroupTree:
+    def __init__(self, keys: SortedList, expanded: Iterable[GroupPath] = ()):
+        self.keys = keys
+        self.counts: Dict[GroupPath, int] = {}
+        self.children: Dict[GroupPath, SortedList] = {(): SortedList()}
+        self.expanded: Set[GroupPath] = set()
+        self.members: Dict[GroupPath, SortedList] = {}
+        self._rows: Optional[List[GroupRow]] = None
+
+        counts = self.counts
+        for leaf, count in Counter(map(group_of, keys)).items():
+            counts[leaf] = count
+            counts[leaf[:1]] = counts.get(leaf[:1], 0) + count
+        for path in counts:
+            self.children.setdefault(path[:-1], SortedList()).add(path[-1])
+
+        for path in sorted(expanded, key=len):
+            if path in counts and path[:-1] in self.expanded | {()}:
+                self.expand(path)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def label(self, path: GroupPath) -> str:
+        if len(path) == 1:
+            return path[0] or OTHER_GROUP_LABEL
+        return path[-1] or EMPTY_SEGMENT_LABEL
+
+    def is_expanded(self, path: GroupPath) -> bool:
+        return path in self.expanded
+
+    def expand(self, path: GroupPath):
+        if path in self.expanded or path not in self.counts:
+            return
+        self.expanded.add(path)
+        if len(path) == 2:
+            self.members[path] = SortedList(self._scan(path))
+        self._rows = None
+
+    def collapse(self, path: GroupPath):
+        for open_path in [p for p in self.expanded if p[:len(path)] == path]:
+            self.expanded.discard(open_path)
+            self.members.pop(open_path, None)
+        self._rows = None
+
+    def toggle(self, path: GroupPath):
+        if path in self.expanded:
+            self.collapse(path)
+        else:
+            self.expand(path)
+
+    def add_many(self, keys: Iterable[str]):
+        for key in keys:
+            self._count(key, 1)
+
+    def remove_many(self, keys: Iterable[str]):
+        for key in keys:
+            self._count(key, -1)
+
+    def rows(self) -> List[GroupRow]:
+        if self._rows is None:
+            rows: List[GroupRow] = []
+            for prefix in self.children[()]:
+                path = (prefix,)
+                rows.append((0, path, None))
+                if path not in self.expanded:
+                    continue
+                for segment in self.children[path]:
+                    leaf = (prefix, segment)
+                    rows.append((1, leaf, None))
+                    if leaf in self.expanded:
+                        rows.extend((2, leaf, key) for key in self.members[leaf])
+            self._rows = rows
+        return self._rows
+
+    def _scan(self, path: GroupPath) -> Iterable[str]:
+        start = "".join(path)
+        candidates = takewhile(lambda key: key.startswith(start), self.keys.irange(minimum=start))
+        return [key for key in candidates if group_of(key) == path]
+
+    def _count(self, key: str, delta: int):
+        prefix, segment = group_of(key)
+        leaf = (prefix, segment)
+        for path in ((prefix,), leaf):
+            count = self.counts.get(path, 0) + delta
+            parent = path[:-1]
+            if count > 0:
+                self.counts[path] = count
+                if count == delta:
+                    self.children.setdefault(parent, SortedList()).add(path[-1])
+                    if parent == () or parent in self.expanded:
+                        self._rows = None
+            else:
+                self.counts.pop(path, None)
+                siblings = self.children.get(parent)
+                if siblings is not None:
+                    siblings.discard(path[-1])
+                    if not siblings and parent:
+                        del self.children[parent]
+                self.collapse(path)
+
+        members = self.members.get(leaf)
+        if members is not None:
+            if delta > 0:
+                members.add(key)
+            else:
+                members.discard(key)
+            self._rows = None
@@ -0,0 +1,290 @@
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sortedcontainers import SortedList
+import json_codec
+from lazy_flags import LazyFlags, same_source, scan_flags
+from search_index import SearchIndex
+from row_store import RowStore
+from settings_sync import FileSignature, MergeResult, file_signature, three_way_merge
+from save_writer import serialize_flags, write_atomic
+from type_engine import coerce_flag, deduce_flag_type, deduce_flag_types
+from undo_journal import FlagState, UndoJournal
+
+SETTINGS_DIR_NAME = "ClientSettings"
+SETTINGS_FILE_NAME = "ClientAppSettings.json"
+FLAG_TYPE_OPTIONS = ["bool", "int", "string"]
+
+
+def get_settings_path(version_path: str) -> str:
+    return os.path.join(version_path, SETTINGS_DIR_NAME, SETTINGS_FILE_NAME)
+
+
+def validate_value(flag_type: str, value: str) -> bool:
+    if flag_type == "bool": return value.lower() in ("true", "false")
+    if flag_type == "int":
+        try: int(value); return True
+        except ValueError: return False
+    return True
+
+
+def convert_value(flag_type: str, value: str) -> Any:
+    if flag_type == "bool": return value.lower() == "true"
+    if flag_type == "int": return int(value)
+    return value
+
+
+def coerce_flags(data: Any) -> Dict[str, Tuple[Any, str]]:
+    if not isinstance(data, dict):
+        raise TypeError("Imported JSON is not a dictionary.")
+    return {key: coerce_flag(key, value) for key, value in data.items()}
+
+
+def parse_flags_json(text: str) -> Dict[str, Tuple[Any, str]]:
+    return coerce_flags(json_codec.loads(text.strip() or "{}"))
+
+
+def read_settings(path: str, lazy_threshold: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content.strip():
+        return None
+    if lazy_threshold is not None and len(content) >= lazy_threshold:
+        flags = scan_flags(content)
+        if flags is not None:
+            return flags
+    return json_codec.loads(content)
+
+
+def same_value(a: Any, b: Any) -> bool:
+    return type(a) is type(b) and a == b
+
+
+def diff_flags(current: Dict[str, Any], other: Dict[str, Any]) -> List[str]:
+    lines = []
+    for key in sorted(current.keys() | other.keys()):
+        if key not in other:
+            lines.append(f"- {key}: {json.dumps(current[key])}")
+        elif key not in current:
+            lines.append(f"+ {key}: {json.dumps(other[key])}")
+        elif not same_value(current[key], other[key]):
+            lines.append(f"~ {key}: {json.dumps(current[key])} -> {json.dumps(other[key])}")
+    return lines
+
+
+class FlagModel:
+    def __init__(self):
+        self.flags: Dict[str, Any] = {}
+        self.rows = RowStore()
+        self.sorted_keys = SortedList()
+        self._search_index: Optional[SearchIndex] = None
+        self.flags_enabled = True
+        self.lazy_threshold: Optional[int] = None
+        self.journal = UndoJournal()
+        self.revision = 0
+        self.pending_before: Optional[Dict[str, FlagState]] = None
+        self.changed_keys: Optional[Set[str]] = None
+
+        self.loaded_snapshot: Dict[str, Any] = {}
+        self.loaded_signature: Optional[FileSignature] = None
+        self.loaded_enabled = True
+
+    @property
+    def search_index(self) -> SearchIndex:
+        if self._search_index is None:
+            self._search_index = SearchIndex(self.flags)
+        return self._search_index
+
+    def flag_type(self, key: str) -> str:
+        flag_type = self.rows.type_of(key)
+        if flag_type is None:
+            flag_type = deduce_flag_type(key, self.flags[key])
+            self.rows.set(key, flag_type)
+        return flag_type
+
+    def flag_state(self, key: str) -> FlagState:
+        return (self.flags[key], self.flag_type(key)) if key in self.flags else None
+
+    def _touch(self, key: str):
+        if self.pending_before is not None and key not in self.pending_before:
+            self.pending_before[key] = self.flag_state(key)
+
+    @contextmanager
+    def transaction(self, label: str) -> Iterator[None]:
+        if self.pending_before is not None:
+            yield
+            return
+        self.pending_before = {}
+        try:
+            yield
+        finally:
+            before, self.pending_before = self.pending_before, None
+            self.journal.record(label, before, {key: self.flag_state(key) for key in before})
+
+    def restore_states(self, states: Dict[str, FlagState]) -> Tuple[List[str], List[str]]:
+        updates = {key: state for key, state in states.items() if state is not None}
+        return self.apply_batch(updates, [key for key, state in states.items() if state is None])
+
+    def undo(self) -> Optional[Tuple[str, List[str], List[str]]]:
+        entry = self.journal.undo()
+        if entry is None:
+            return None
+        return (entry.label,) + self.restore_states(entry.before)
+
+    def redo(self) -> Optional[Tuple[str, List[str], List[str]]]:
+        entry = self.journal.redo()
+        if entry is None:
+            return None
+        return (entry.label,) + self.restore_states(entry.after)
+
+    def set_flag(self, key: str, value: Any, flag_type: Optional[str] = None) -> bool:
+        self._touch(key)
+        self.revision += 1
+        is_new = key not in self.flags
+        if is_new:
+            if self._search_index is not None:
+                self._search_index.add(key)
+            self.sorted_keys.add(key)
+        self.flags[key] = value
+        self.rows.set(key, flag_type or deduce_flag_type(key, value))
+        if self.changed_keys is not None:
+            self.changed_keys.add(key)
+        return is_new
+
+    def remove_flag(self, key: str) -> bool:
+        if key not in self.flags:
+            return False
+        self._touch(key)
+        self.revision += 1
+        del self.flags[key]
+        self.rows.remove(key)
+        if self._search_index is not None:
+            self._search_index.remove(key)
+        self.sorted_keys.remove(key)
+        return True
+
+    def rename_flag(self, old_key: str, new_key: str):
+        self.set_flag(new_key, self.flags[old_key], self.flag_type(old_key))
+        self.remove_flag(old_key)
+
+    def replace_flags(self, flags: Dict[str, Any], flag_types: Optional[Dict[str, str]] = None):
+        self.revision += 1
+        if self.pending_before is not None:
+            for key in self.flags:
+                if key not in flags or not (same_source(self.flags, flags, key) or same_value(self.flags[key], flags[key])):
+                    self._touch(key)
+            for key in flags.keys() - self.flags.keys():
+                self._touch(key)
+        self.flags = flags
+        if flag_types is None and not isinstance(flags, LazyFlags):
+            flag_types = deduce_flag_types(flags)
+        self.rows.rebuild(flags, flag_types)
+        self._search_index = None
+        self.sorted_keys = SortedList(flags)
+
+    def apply_batch(self, updates: Dict[str, Tuple[Any, str]], removals: Iterable[str]) -> Tuple[List[str], List[str]]:
+        removed = [key for key in removals if key in self.flags]
+        self.revision += 1
+        if self.pending_before is not None:
+            for key in removed:
+                self._touch(key)
+            for key in updates:
+                self._touch(key)
+        reindex = len(removed) > len(self.flags) // 4
+        if reindex:
+            self._search_index = None
+        search_index = self._search_index
+        for key in removed:
+            del self.flags[key]
+            self.rows.remove(key)
+            if search_index is not None:
+                search_index.remove(key)
+            if not reindex:
+                self.sorted_keys.remove(key)
+
+        added = []
+        for key, (value, flag_type) in updates.items():
+            if key not in self.flags:
+                if search_index is not None:
+                    search_index.add(key)
+                added.append(key)
+            self.flags[key] = value
+            self.rows.set(key, flag_type)
+        if self.changed_keys is not None:
+            self.changed_keys.update(updates)
+
+        if reindex:
+            self.sorted_keys.clear()
+            self.sorted_keys.update(self.flags)
+        else:
+            self.sorted_keys.update(added)
+        return added, removed
+
+    def import_flags(self, entries: Dict[str, Tuple[Any, str]], overwrite: bool) -> List[str]:
+        if overwrite:
+            self.replace_flags({key: value for key, (value, _) in entries.items()},
+                               {key: flag_type for key, (_, flag_type) in entries.items()})
+            return list(entries)
+        return [key for key, (value, flag_type) in entries.items() if self.set_flag(key, value, flag_type)]
+
+    def load(self, path: str):
+        signature = file_signature(path)
+        if signature is not None:
+            loaded = read_settings(path, self.lazy_threshold)
+            if loaded is not None:
+                self.replace_flags(loaded)
+                self.flags_enabled = True
+            else:
+                self.flags_enabled = False
+        else:
+            self.replace_flags({})
+            self.flags_enabled = True
+
+        self.loaded_snapshot = self.flags.copy()
+        self.loaded_signature = signature
+        self.loaded_enabled = self.flags_enabled
+
+    def is_unchanged_on_disk(self, path: str) -> bool:
+        signature = file_signature(path)
+        return signature is not None and signature == self.loaded_signature
+
+    def restore_snapshot(self):
+        self.replace_flags(self.loaded_snapshot.copy())
+        self.flags_enabled = self.loaded_enabled
+
+    def mark_saved(self, flags: Optional[Dict[str, Any]], signature: Optional[FileSignature]):
+        self.loaded_snapshot = flags if flags is not None else {}
+        self.loaded_signature = signature
+        self.loaded_enabled = flags is not None
+
+    def merge_external(self, path: str, written_signature: Optional[FileSignature] = None) -> Optional[MergeResult]:
+        signature = file_signature(path)
+        if signature is None or signature == self.loaded_signature or signature == written_signature:
+            return None
+
+        try:
+            theirs = read_settings(path)
+        except (OSError, ValueError):
+            return None
+
+        self.loaded_signature = signature
+        if theirs is None:
+            return None
+
+        merge = three_way_merge(self.loaded_snapshot, self.flags, theirs)
+        self.loaded_snapshot = theirs
+
+        merge.added = [key for key, value in merge.updates.items() if self.set_flag(key, value)]
+        for key in merge.removals:
+            self.remove_flag(key)
+        return merge
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        return self.flags.copy() if self.flags_enabled else None
+
+    def save(self, path: str):
+        flags = self.snapshot()
+        write_atomic(path, serialize_flags(flags))
+        self.mark_saved(flags, file_signature(path))
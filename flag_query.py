@@ -0,0 +1,374 @@
+import operator
+import re
+from array import array
+from collections import OrderedDict
+from itertools import compress, repeat
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from flag_model import FlagModel
+from row_store import UNKNOWN_CODE
+from type_engine import TYPE_CODES
+
+COMPILED_CACHE_SIZE = 64
+RESULT_CACHE_SIZE = 32
+
+TOKEN_PATTERN = re.compile(r'\s*(?:(\()|(\))|((?:[^\s()"]|"(?:[^"\\]|\\.)*")+))')
+FIELD_PATTERN = re.compile(r"(name|type|value)(!=|>=|<=|:|=|>|<)(.*)$", re.IGNORECASE | re.DOTALL)
+NUMBER_PATTERN = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?$")
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    "=": operator.eq, "!=": operator.ne, ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+}
+NAN = float("nan")
+
+
+class QueryError(ValueError):
+    pass
+
+
+def value_text(value: Any) -> str:
+    return str(value).lower()
+
+
+def value_number(value: Any) -> float:
+    if isinstance(value, bool):
+        return NAN
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str) and NUMBER_PATTERN.match(value.strip()):
+        return float(value)
+    return NAN
+
+
+class QueryColumns:
+    def __init__(self, model: FlagModel):
+        self.model = model
+        self.revision = model.revision
+        rows = model.rows
+        self.names = list(rows.codes)
+        type_codes = rows.type_column()
+        unknown = type_codes.find(UNKNOWN_CODE)
+        if unknown != -1:
+            while unknown != -1:
+                model.flag_type(self.names[unknown])
+                unknown = type_codes.find(UNKNOWN_CODE, unknown + 1)
+            type_codes = rows.type_column()
+        self.type_codes = type_codes
+        self.live = int.from_bytes(b"\x01" * len(self.names), "little")
+        self._texts: Optional[List[str]] = None
+        self._numbers: Optional[array] = None
+
+    @property
+    def texts(self) -> List[str]:
+        if self._texts is None:
+            flags = self.model.flags
+            self._texts = [value_text(flags[name]) for name in self.names]
+        return self._texts
+
+    @property
+    def numbers(self) -> array:
+        if self._numbers is None:
+            flags = self.model.flags
+            self._numbers = array("d", (value_number(flags[name]) for name in self.names))
+        return self._numbers
+
+    def mask_of_keys(self, keys: List[str]) -> int:
+        return _mask(map(set(keys).__contains__, self.names))
+
+
+def _mask(flags: Any) -> int:
+    return int.from_bytes(bytes(flags), "little")
+
+
+class Node:
+    def evaluate(self, columns: QueryColumns) -> int:
+        raise NotImplementedError
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        raise NotImplementedError
+
+    def reads_values(self) -> bool:
+        return True
+
+
+class AndNode(Node):
+    def __init__(self, children: List[Node]):
+        self.children = children
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        mask = columns.live
+        for child in self.children:
+            mask &= child.evaluate(columns)
+            if not mask:
+                break
+        return mask
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        return all(child.matches(model, key) for child in self.children)
+
+    def reads_values(self) -> bool:
+        return any(child.reads_values() for child in self.children)
+
+
+class OrNode(Node):
+    def __init__(self, children: List[Node]):
+        self.children = children
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        mask = 0
+        for child in self.children:
+            mask |= child.evaluate(columns)
+        return mask
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        return any(child.matches(model, key) for child in self.children)
+
+    def reads_values(self) -> bool:
+        return any(child.reads_values() for child in self.children)
+
+
+class NotNode(Node):
+    def __init__(self, child: Node):
+        self.child = child
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        return columns.live & ~self.child.evaluate(columns)
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        return not self.child.matches(model, key)
+
+    def reads_values(self) -> bool:
+        return self.child.reads_values()
+
+
+class NameContains(Node):
+    def __init__(self, text: str):
+        self.text = text.lower()
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        return columns.mask_of_keys(columns.model.search_index.search(self.text))
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        return self.text in key.lower()
+
+    def reads_values(self) -> bool:
+        return False
+
+
+class NameRegex(Node):
+    def __init__(self, pattern: str):
+        try:
+            self.regex = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            raise QueryError(f"Bad regular expression /{pattern}/: {e}")
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        return _mask(map(bool, map(self.regex.search, columns.names)))
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        return self.regex.search(key) is not None
+
+    def reads_values(self) -> bool:
+        return False
+
+
+class TypeIs(Node):
+    def __init__(self, type_name: str):
+        code = TYPE_CODES.get(type_name.lower())
+        if code is None:
+            raise QueryError(f"Unknown type '{type_name}', expected one of {', '.join(TYPE_CODES)}.")
+        self.type_name = type_name.lower()
+        self.table = bytes(1 if i == code else 0 for i in range(256))
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        return int.from_bytes(columns.type_codes.translate(self.table), "little")
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        return model.flag_type(key) == self.type_name
+
+
+class ValueContains(Node):
+    def __init__(self, text: str):
+        self.text = text.lower()
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        return _mask(map(operator.contains, columns.texts, repeat(self.text)))
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        return self.text in value_text(model.flags[key])
+
+
+class ValueCompare(Node):
+    def __init__(self, op: str, operand: str):
+        self.compare = COMPARISONS[op]
+        self.number = float(operand) if NUMBER_PATTERN.match(operand) else None
+        if self.number is None and op not in ("=", "!="):
+            raise QueryError(f"'value{op}' needs a number, got '{operand}'.")
+        self.text = operand.lower()
+
+    def evaluate(self, columns: QueryColumns) -> int:
+        if self.number is None:
+            return _mask(map(self.compare, columns.texts, repeat(self.text)))
+        return _mask(map(self.compare, columns.numbers, repeat(self.number)))
+
+    def matches(self, model: FlagModel, key: str) -> bool:
+        value = model.flags[key]
+        if self.number is None:
+            return self.compare(value_text(value), self.text)
+        return self.compare(value_number(value), self.number)
+
+
+def _unquote(text: str) -> str:
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        return re.sub(r"\\(.)", r"\1", text[1:-1])
+    return text
+
+
+def _term(word: str) -> Node:
+    if len(word) >= 2 and word[0] == "/" and word[-1] == "/":
+        return NameRegex(word[1:-1])
+
+    match = FIELD_PATTERN.match(word)
+    if match is None:
+        return NameContains(_unquote(word))
+
+    field, op, operand = match.group(1).lower(), match.group(2), _unquote(match.group(3))
+    if not operand:
+        raise QueryError(f"'{field}{op}' is missing a value.")
+    if field == "type":
+        if op not in (":", "="):
+            raise QueryError("type only supports 'type:NAME'.")
+        return TypeIs(operand)
+    if field == "name":
+        if len(operand) >= 2 and operand[0] == "/" and operand[-1] == "/":
+            return NameRegex(operand[1:-1])
+        if op != ":":
+            raise QueryError("name only supports 'name:TEXT' and 'name:/REGEX/'.")
+        return NameContains(operand)
+    if op == ":":
+        return ValueContains(operand)
+    return ValueCompare(op, operand)
+
+
+class _Parser:
+    def __init__(self, query: str):
+        self.tokens: List[Tuple[str, str]] = []
+        position = 0
+        query = query.strip()
+        while position < len(query):
+            match = TOKEN_PATTERN.match(query, position)
+            if match is None or match.end() == position:
+                raise QueryError(f"Unexpected character at position {position + 1}.")
+            if match.group(1):
+                self.tokens.append(("(", "("))
+            elif match.group(2):
+                self.tokens.append((")", ")"))
+            else:
+                self.tokens.append(("word", match.group(3)))
+            position = match.end()
+        self.index = 0
+
+    def peek(self) -> Optional[Tuple[str, str]]:
+        return self.tokens[self.index] if self.index < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, str]:
+        token = self.tokens[self.index]
+        self.index += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise QueryError("Unbalanced ')'.")
+        return node
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.peek() in (("word", "OR"), ("word", "|")):
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else OrNode(children)
+
+    def parse_and(self) -> Node:
+        children = []
+        while True:
+            token = self.peek()
+            if token is None or token[0] == ")" or token in (("word", "OR"), ("word", "|")):
+                break
+            if token == ("word", "AND"):
+                self.take()
+                continue
+            children.append(self.parse_unary())
+        if not children:
+            raise QueryError("Expected a search term.")
+        return children[0] if len(children) == 1 else AndNode(children)
+
+    def parse_unary(self) -> Node:
+        kind, text = self.take()
+        if kind == "(":
+            node = self.parse_or()
+            if self.peek() is None or self.peek()[0] != ")":
+                raise QueryError("Missing ')'.")
+            self.take()
+            return node
+        if kind == ")":
+            raise QueryError("Unbalanced ')'.")
+        if text in ("NOT", "-", "!"):
+            if self.peek() is None:
+                raise QueryError(f"'{text}' needs something to negate.")
+            return NotNode(self.parse_unary())
+        if len(text) > 1 and text[0] in "-!":
+            return NotNode(_term(text[1:]))
+        return _term(text)
+
+
+def compile_query(query: str) -> Node:
+    return _Parser(query).parse()
+
+
+class QueryEngine:
+    def __init__(self, model: FlagModel):
+        self.model = model
+        self.compiled: "OrderedDict[str, Node]" = OrderedDict()
+        self.results: "OrderedDict[str, Tuple[int, List[str]]]" = OrderedDict()
+        self._columns: Optional[QueryColumns] = None
+
+    def compile(self, query: str) -> Node:
+        node = self.compiled.get(query)
+        if node is None:
+            node = compile_query(query)
+            self.compiled[query] = node
+            while len(self.compiled) > COMPILED_CACHE_SIZE:
+                self.compiled.popitem(last=False)
+        else:
+            self.compiled.move_to_end(query)
+        return node
+
+    def columns(self) -> QueryColumns:
+        if self._columns is None or self._columns.revision != self.model.revision or self._columns.model is not self.model:
+            self._columns = QueryColumns(self.model)
+        return self._columns
+
+    def search(self, query: str) -> List[str]:
+        cached = self.results.get(query)
+        if cached is not None and cached[0] == self.model.revision:
+            self.results.move_to_end(query)
+            return cached[1]
+
+        node = self.compile(query)
+        if isinstance(node, NameContains):
+            keys = self.model.search_index.search(node.text)
+        else:
+            columns = self.columns()
+            mask = (node.evaluate(columns) & columns.live).to_bytes(len(columns.names), "little")
+            keys = list(compress(columns.names, mask))
+
+        self.results[query] = (self.model.revision, keys)
+        while len(self.results) > RESULT_CACHE_SIZE:
+            self.results.popitem(last=False)
+        return keys
+
+    def matches(self, query: str, key: str) -> bool:
+        return self.compile(query).matches(self.model, key)
+
+    def reads_values(self, query: str) -> bool:
+        return self.compile(query).reads_values()
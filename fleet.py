@@ -0,0 +1,116 @@
+import glob
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flag_model import FlagModel, diff_flags, get_settings_path, read_settings, same_value
+from version_watcher import find_latest_player_version
+
+DEFAULT_WORKERS = 8
+
+
+class RootResult:
+    def __init__(self, root: str):
+        self.root = root
+        self.version_path: Optional[str] = None
+        self.status = "pending"
+        self.diff: List[str] = []
+        self.error: Optional[str] = None
+        self.elapsed = 0.0
+
+
+class FleetReport:
+    def __init__(self, results: List[RootResult], elapsed: float):
+        self.results = results
+        self.elapsed = elapsed
+
+    def count(self, status: str) -> int:
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def changed_flags(self) -> int:
+        return sum(len(result.diff) for result in self.results)
+
+    @property
+    def roots_per_second(self) -> float:
+        return len(self.results) / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def flags_per_second(self) -> float:
+        return self.changed_flags / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def expand_roots(patterns: Iterable[str]) -> List[str]:
+    roots: List[str] = []
+    seen = set()
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for root in matches:
+            root = os.path.abspath(root)
+            if root not in seen and os.path.isdir(root):
+                seen.add(root)
+                roots.append(root)
+    return roots
+
+
+def find_root_version(root: str) -> Optional[str]:
+    return find_latest_player_version(os.path.join(root, "Roblox", "Versions"))
+
+
+def apply_to_root(root: str, entries: Dict[str, Tuple[Any, str]], overwrite: bool = False,
+                  dry_run: bool = False, verify: bool = True) -> RootResult:
+    result = RootResult(root)
+    start = time.perf_counter()
+    try:
+        result.version_path = find_root_version(root)
+        if not result.version_path:
+            result.status = "no-install"
+            return result
+
+        settings_path = get_settings_path(result.version_path)
+        model = FlagModel()
+        model.load(settings_path)
+
+        flags = {key: value for key, (value, _) in entries.items()}
+        current = dict(model.flags) if model.flags_enabled else {}
+        target = flags if overwrite else {**current, **flags}
+        result.diff = diff_flags(current, target)
+
+        if not result.diff and model.flags_enabled:
+            result.status = "unchanged"
+        elif dry_run:
+            result.status = "dry-run"
+        else:
+            model.import_flags(entries, overwrite)
+            model.flags_enabled = True
+            model.save(settings_path)
+            if verify and not _verify(settings_path, target):
+                result.status = "error"
+                result.error = "verification failed: file contents differ from the applied flags"
+            else:
+                result.status = "applied"
+    except Exception as e:
+        result.status = "error"
+        result.error = str(e)
+    finally:
+        result.elapsed = time.perf_counter() - start
+    return result
+
+
+def _verify(settings_path: str, expected: Dict[str, Any]) -> bool:
+    written = read_settings(settings_path) or {}
+    if written.keys() != expected.keys():
+        return False
+    return all(same_value(written[key], value) for key, value in expected.items())
+
+
+def apply_to_roots(roots: List[str], entries: Dict[str, Tuple[Any, str]], overwrite: bool = False,
+                   dry_run: bool = False, verify: bool = True, workers: int = DEFAULT_WORKERS) -> FleetReport:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(
+            lambda root: apply_to_root(root, entries, overwrite=overwrite, dry_run=dry_run, verify=verify),
+            roots,
+        ))
+    return FleetReport(results, time.perf_counter() - start)
@@ -1,24 +1,71 @@
 import json
 import os
+import re
 import imgui
 import pygame
 import shutil
-from typing import Dict, Any, List
+import sqlite3
+from typing import TYPE_CHECKING, Dict, Any, Iterable, List, Optional, Set, Tuple
+from sortedcontainers import SortedList
+from flag_model import (
+    FLAG_TYPE_OPTIONS, FlagModel, convert_value, diff_flags, get_settings_path, parse_flags_json, validate_value,
+)
+from version_watcher import VersionWatcher, find_latest_player_version, get_versions_dir
+from save_writer import SaveWriter
+from profiler import Profiler
+from flag_catalog import CatalogEntry, FlagCatalog
+from type_engine import TYPE_NAMES
+from row_store import SELECTED, UNKNOWN_CODE
+from file_transfer import TransferCancelled, TransferJob, start_export, start_export_text, start_import
+from bulk_ops import (
+    BULK_OPERATIONS, Batch, change_type_batch, delete_batch, rename_batch, replace_batch, set_value_batch,
+    toggle_bools_batch,
+)
+from backup_store import BackupStore, Snapshot, get_backup_dir, source_name
+from flag_groups import GroupPath, GroupTree
+from flag_query import QueryEngine, QueryError
+from profile_store import Profile, ProfileStore, get_profile_db_path
+from flag_compare import DIFF_KINDS, KIND_MARKS, CompareJob, CompareSource, FlagDiff, start_compare, version_sources
+
+if TYPE_CHECKING:
+    from local_api import ApiServer
 
 AUTOSAVE_DELAY = 1000
-UPDATE_CHECK_INTERVAL = 5000
+SEARCH_DEBOUNCE_DELAY = 150
+EXTERNAL_CHANGE_CHECK_INTERVAL = 1000
+REFILTER_KEY_LIMIT = 1000
+TRANSFER_REFRESH_INTERVAL = 100
+EXPORT_PREVIEW_LIMIT = 1024 * 1024
+BACKUP_DIFF_LIMIT = 2000
+COMPARE_COLORS = {"added": (0.4, 0.9, 0.4), "removed": (1.0, 0.4, 0.4), "changed": (1.0, 0.8, 0.3)}
 
 class FastFlagEditorApp:
-    def __init__(self):
-        self.flags: Dict[str, Any] = {}
-        self.flag_types: Dict[str, str] = {}
-        self.filtered_flags: List[str] = []
+    def __init__(self, lazy_threshold: Optional[int] = None):
+        self.model = FlagModel()
+        self.model.changed_keys = set()
+        self.query_engine = QueryEngine(self.model)
+        self.model.lazy_threshold = lazy_threshold
+        self.filtered_flags = self.model.sorted_keys
 
         self.search_text = ""
-        self.selected_flags: Dict[str, bool] = {}
+        self.active_search = ""
+        self.search_error = ""
+        self.search_scheduled_time: float = -1.0
+        self.group_view = False
+        self.group_tree: Optional[GroupTree] = None
 
         self.autosave_scheduled_time: float = -1.0
-        self.last_update_check_time: float = 0.0
+        self.save_writer = SaveWriter(on_complete=self._post_wakeup)
+        self.save_status = ""
+        backup_dir = get_backup_dir()
+        self.backups: Optional[BackupStore] = BackupStore(backup_dir) if backup_dir else None
+        if self.backups is not None:
+            self.save_writer.backup = self.backup_saved_flags
+        profile_path = get_profile_db_path()
+        self.profiles: Optional[ProfileStore] = ProfileStore(profile_path) if profile_path else None
+        self.active_profile = ""
+        self.api: Optional["ApiServer"] = None
+        self.external_check_pending = False
 
         self.show_add_popup = False
         self.show_edit_popup = False
@@ -28,10 +75,14 @@ class FastFlagEditorApp:
         self.show_export_popup = False
         self.show_error_popup = False
         self.show_rename_popup = False
+        self.show_bulk_popup = False
+        self.show_backups_popup = False
+        self.show_profiles_popup = False
+        self.show_compare_popup = False
         self.popup_rename_old_name = ""
         self.popup_rename_new_name = ""
         self.popup_edit_new_name = ""
-        self.last_selected_index = -1
+        self.last_selected_key: Optional[str] = None
 
         self.popup_add_name = ""
         self.popup_add_type_idx = 0
@@ -41,51 +92,207 @@ class FastFlagEditorApp:
         self.popup_edit_value = ""
         self.popup_import_text = ""
         self.popup_export_text = ""
+        self.popup_export_revision = -1
+        self.popup_import_path = ""
+        self.popup_export_path = ""
+        self.transfer_job: Optional[TransferJob] = None
+        self.export_preview_job: Optional[TransferJob] = None
+        self.compare_job: Optional[CompareJob] = None
+        self.compare_diff: Optional[FlagDiff] = None
+        self.compare_labels = ("", "")
+        self.compare_from_left = False
+        self.compare_kinds: Set[str] = set(DIFF_KINDS)
+        self.compare_selected: Set[str] = set()
+        self.popup_bulk_scope = 0
+        self.popup_bulk_op_idx = 0
+        self.popup_bulk_type_idx = 0
+        self.popup_bulk_value = ""
+        self.popup_bulk_pattern = ""
+        self.popup_bulk_replacement = ""
+        self.popup_bulk_regex = False
+        self.popup_backup_list: List[Snapshot] = []
+        self.popup_backup_idx = -1
+        self.popup_backup_diff = ""
+        self.popup_profile_list: List[Profile] = []
+        self.popup_profile_idx = -1
+        self.popup_profile_name = ""
+        self.popup_profile_preview = ""
+        self.popup_compare_sources: List[CompareSource] = []
+        self.popup_compare_left_idx = 0
+        self.popup_compare_right_idx = 1
+        self.popup_compare_paths = ["", ""]
         self.error_popup_title = ""
         self.error_popup_message = ""
 
-        self.flag_type_options = ["bool", "int", "string"]
+        self.flag_type_options = FLAG_TYPE_OPTIONS
+
+        self.catalog: Optional[FlagCatalog] = None
+        self.suggestion_query = ""
+        self.suggestions: List[CatalogEntry] = []
 
         self.known_latest_version_path = self.get_latest_roblox_version_with_player()
+        self.version_watcher = VersionWatcher(
+            get_versions_dir(), self.known_latest_version_path,
+            poll_interval=EXTERNAL_CHANGE_CHECK_INTERVAL / 1000, on_change=self._post_wakeup,
+        )
+        self.version_watcher.start()
 
-        self.flags_enabled = True
+        self.virtualize_table = hasattr(imgui, "ListClipper")
+        self.show_frame_rate = False
+        self.frame_rate = 0.0
+        self.profiler = Profiler()
+        self.show_profiler = False
 
         self.load_flags()
 
+    @property
+    def flags(self) -> Dict[str, Any]:
+        return self.model.flags
+
+    @property
+    def flags_enabled(self) -> bool:
+        return self.model.flags_enabled
+
+    @flags_enabled.setter
+    def flags_enabled(self, enabled: bool):
+        self.model.flags_enabled = enabled
+
     def update(self):
+        self._on_keys_changed()
+        self.report_dropped_undo()
+
+        if self.search_scheduled_time > 0 and pygame.time.get_ticks() > self.search_scheduled_time:
+            self.filter_flags()
+            self.search_scheduled_time = -1.0
 
         if self.autosave_scheduled_time > 0 and pygame.time.get_ticks() > self.autosave_scheduled_time:
             self.save_flags()
             self.autosave_scheduled_time = -1.0
 
-        current_time = pygame.time.get_ticks()
-        if current_time - self.last_update_check_time > UPDATE_CHECK_INTERVAL:
-            self.check_for_roblox_update()
-            self.last_update_check_time = current_time
+        self.handle_save_results()
+
+        if self.transfer_job is not None and self.transfer_job.finished:
+            self.finish_transfer()
+
+        if self.compare_job is not None and self.compare_job.finished:
+            self.finish_compare()
+
+        if self.export_preview_job is not None and self.export_preview_job.finished:
+            self.finish_export_preview()
+
+        if self.api is not None:
+            self.process_api_calls()
+
+        latest_path = self.version_watcher.poll()
+        if latest_path:
+            with self.profiler.section("update_check"):
+                self.check_for_roblox_update(latest_path)
+
+        if self.version_watcher.poll_file_change():
+            self.external_check_pending = True
+        if self.external_check_pending and self.save_writer.is_idle():
+            self.external_check_pending = False
+            with self.profiler.section("external_check"):
+                self.check_for_external_changes()
+
+    def ticks_until_next_timer(self) -> Optional[int]:
+        deadlines = [t for t in (self.search_scheduled_time, self.autosave_scheduled_time) if t > 0]
+        if self.transfer_job is not None or self.compare_job is not None or self.export_preview_job is not None:
+            deadlines.append(pygame.time.get_ticks() + TRANSFER_REFRESH_INTERVAL)
+        if not deadlines:
+            return None
+        return max(1, int(min(deadlines) - pygame.time.get_ticks()) + 1)
+
+    def shutdown(self):
+        if self.transfer_job is not None:
+            self.transfer_job.cancel()
+        if self.compare_job is not None:
+            self.compare_job.cancel()
+        if self.export_preview_job is not None:
+            self.export_preview_job.cancel()
+        if self.autosave_scheduled_time > 0:
+            self.save_flags()
+            self.autosave_scheduled_time = -1.0
+        if self.api is not None:
+            self.api.stop()
+        self.save_writer.stop()
+        self.version_watcher.stop()
+        if self.profiles is not None:
+            self.profiles.close()
+
+    def _post_wakeup(self):
+        try:
+            pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+        except pygame.error:
+            pass
+
+    def handle_save_results(self):
+        for result in self.save_writer.poll():
+            self.profiler.add("save_write", result.elapsed)
+            if result.ok:
+                self.save_status = "Saved" if result.written else "No changes"
+                if result.path == self.get_settings_path():
+                    self.model.mark_saved(result.flags, result.signature)
+            else:
+                self.save_status = "Save failed"
+                self.trigger_error_popup("Error Saving Flags", f"Failed to save flags: {result.error}")
+            if result.backup_error is not None:
+                self.save_writer.backup = None
+                self.trigger_error_popup(
+                    "Backup Error",
+                    f"Could not back up the saved flags: {result.backup_error}\nBackups are off until the editor is restarted."
+                )
+
+    def check_for_external_changes(self):
+        settings_path = self.get_settings_path()
+        if not settings_path or not self.save_writer.is_idle():
+            return
+        self.handle_save_results()
+
+        merge = self.model.merge_external(settings_path, self.save_writer.written_signature(settings_path))
+        if merge is None:
+            return
+
+        if merge:
+            self._on_keys_added(merge.added)
+            self._on_keys_removed(merge.removals)
+            self._on_keys_changed()
+            self.clear_selection()
 
-    def check_for_roblox_update(self):
-        current_latest_path = self.get_latest_roblox_version_with_player()
+        if merge.conflicts:
+            self.trigger_error_popup(
+                "External Changes",
+                f"ClientAppSettings.json was changed by another program.\n"
+                f"Kept your edits for {len(merge.conflicts)} conflicting flag(s)."
+            )
+
+    def check_for_roblox_update(self, current_latest_path: Optional[str] = None):
+        if current_latest_path is None:
+            current_latest_path = self.get_latest_roblox_version_with_player()
 
         if current_latest_path and current_latest_path != self.known_latest_version_path:
-            old_version_path = self.known_latest_version_path
-            old_settings_path = os.path.join(old_version_path, "ClientSettings", "ClientAppSettings.json")
+            old_version_path = self.known_latest_version_path or ""
+            old_settings_path = get_settings_path(old_version_path)
 
             self.trigger_error_popup(
                 "Roblox Update Detected",
                 f"New version found!\nFrom: {os.path.basename(old_version_path)}\nTo: {os.path.basename(current_latest_path)}"
             )
 
-            if os.path.exists(old_settings_path):
+            self.save_writer.flush()
+
+            if old_version_path and os.path.exists(old_settings_path):
+                self.backup_file(old_settings_path, "migrate")
                 try:
-                    new_settings_dir = os.path.join(current_latest_path, "ClientSettings")
-                    os.makedirs(new_settings_dir, exist_ok=True)
-                    new_settings_path = os.path.join(new_settings_dir, "ClientAppSettings.json")
+                    new_settings_path = get_settings_path(current_latest_path)
+                    os.makedirs(os.path.dirname(new_settings_path), exist_ok=True)
                     shutil.copy2(old_settings_path, new_settings_path)
                     print(f"Successfully copied flags from {old_version_path} to {current_latest_path}")
                 except Exception as e:
                     self.trigger_error_popup("Migration Error", f"Could not copy flags: {e}")
 
             self.known_latest_version_path = current_latest_path
+            self.model.journal.clear()
             self.load_flags()
 
     def draw_ui(self):
@@ -96,9 +303,10 @@ class FastFlagEditorApp:
 
         opened, _ = imgui.begin("MainApp", closable=False, flags=window_flags)
         if opened:
+            self.handle_shortcuts()
 
             available_width = imgui.get_content_region_available_width()
-            button_count = 5
+            button_count = 9
             button_spacing = imgui.get_style().item_spacing.x
             button_width = (available_width - (button_spacing * (button_count - 1))) / button_count
 
@@ -106,25 +314,58 @@ class FastFlagEditorApp:
             if imgui.button(toggle_label):
                 self.flags_enabled = not self.flags_enabled
                 self.schedule_autosave()
+            imgui.same_line()
+            if imgui.button("Undo"): self.undo()
+            imgui.same_line()
+            if imgui.button("Redo"): self.redo()
+            if self.show_frame_rate:
+                imgui.same_line()
+                imgui.text(f"{self.frame_rate:.0f} FPS")
+            if self.save_status:
+                imgui.same_line()
+                imgui.text(self.save_status)
+            if self.transfer_job is not None:
+                imgui.same_line()
+                job = self.transfer_job
+                imgui.progress_bar(job.progress, (200, 0), f"{job.kind.capitalize()} {job.progress * 100:.0f}%")
+                imgui.same_line()
+                if imgui.button("Cancel##transfer"): job.cancel()
             imgui.separator()
             if imgui.button("Add Flag", width=button_width): self.trigger_add_popup()
             imgui.same_line()
             if imgui.button("Remove Selected", width=button_width): self.trigger_remove_popup()
             imgui.same_line()
+            if imgui.button("Bulk Edit", width=button_width): self.trigger_bulk_popup()
+            imgui.same_line()
             if imgui.button("Refresh", width=button_width): self.trigger_refresh_popup()
             imgui.same_line()
             if imgui.button("Import", width=button_width): self.trigger_import_popup()
             imgui.same_line()
             if imgui.button("Export", width=button_width): self.trigger_export_popup()
+            imgui.same_line()
+            if imgui.button("Backups", width=button_width): self.trigger_backups_popup()
+            imgui.same_line()
+            if imgui.button("Profiles", width=button_width): self.trigger_profiles_popup()
+            imgui.same_line()
+            if imgui.button("Compare", width=button_width): self.trigger_compare_popup()
 
             imgui.separator()
 
+            if imgui.button("Select All"): self.select_all()
+            imgui.same_line()
+            changed, group_view = imgui.checkbox("Group", self.group_view)
+            if changed: self.set_group_view(group_view)
+            imgui.same_line()
             imgui.text("Search:")
             imgui.same_line()
             search_available_width = imgui.get_content_region_available_width()
             imgui.set_next_item_width(search_available_width)
             changed, self.search_text = imgui.input_text("##search", self.search_text, 256)
-            if changed: self.filter_flags()
+            if changed: self.schedule_search()
+            if imgui.is_item_hovered():
+                imgui.set_tooltip("text, /regex/, type:int, value>100, value=true, value:text, NOT, OR, ( )")
+            if self.search_error:
+                imgui.text_colored(self.search_error, 1.0, 0.4, 0.4)
 
             imgui.separator()
 
@@ -141,185 +382,385 @@ class FastFlagEditorApp:
                 imgui.table_setup_column("Value",   init_width_or_weight=3.0)
                 imgui.table_headers_row()
 
-                for key in list(self.filtered_flags):
-                    value = self.flags.get(key)
-
-                    if value is None: continue
+                if self.group_tree is not None:
+                    group_rows = self.group_tree.rows()
+                    if self.virtualize_table:
+                        clipper = imgui.ListClipper()
+                        clipper.begin(len(group_rows))
+                        while clipper.step():
+                            for index in range(clipper.display_start, clipper.display_end):
+                                self.draw_group_tree_row(*group_rows[index])
+                        clipper.end()
+                    else:
+                        for row in list(group_rows):
+                            self.draw_group_tree_row(*row)
+                elif self.virtualize_table:
+                    clipper = imgui.ListClipper()
+                    clipper.begin(len(self.filtered_flags))
+                    while clipper.step():
+                        for index in range(clipper.display_start, clipper.display_end):
+                            self.draw_flag_row(index, self.filtered_flags[index])
+                    clipper.end()
+                else:
+                    for index, key in enumerate(list(self.filtered_flags)):
+                        self.draw_flag_row(index, key)
 
-                    flag_type = self.flag_types.get(key, "string")
+                imgui.end_table()
 
-                    imgui.table_next_row()
+            self.draw_add_popup()
+            self.draw_rename_popup()
+            self.draw_bulk_popup()
+            self.draw_edit_popup()
+            self.draw_remove_popup()
+            self.draw_import_popup()
+            self.draw_export_popup()
+            self.draw_backups_popup()
+            self.draw_profiles_popup()
+            self.draw_compare_popup()
+            self.draw_error_popup()
+            self.draw_refresh_popup()
 
-                    imgui.table_next_column()
-                    available_width = imgui.get_content_region_available_width()
-                    button_width = (available_width - imgui.get_style().item_spacing.x) / 0.96
+        imgui.end()
 
-                    if imgui.button(f"Edit##{key}", width=button_width, height=0):
-                        self.trigger_edit_popup(key)
+        if self.show_profiler:
+            self.draw_profiler_overlay()
+
+    def draw_profiler_overlay(self):
+        imgui.set_next_window_bg_alpha(0.85)
+        overlay_flags = imgui.WINDOW_ALWAYS_AUTO_RESIZE | imgui.WINDOW_NO_FOCUS_ON_APPEARING | imgui.WINDOW_NO_SAVED_SETTINGS
+        expanded, self.show_profiler = imgui.begin("Profiler", closable=True, flags=overlay_flags)
+        if expanded:
+            if imgui.begin_table("ProfilerTable", 5, flags=imgui.TABLE_BORDERS):
+                for column in ("Section", "p50 ms", "p95 ms", "max ms", "frames"):
+                    imgui.table_setup_column(column)
+                imgui.table_headers_row()
 
+                for name, stats in self.profiler.summary().items():
+                    imgui.table_next_row()
                     imgui.table_next_column()
-                    is_selected = self.selected_flags.get(key, False)
-
-                    clicked, _ = imgui.selectable(key, is_selected)
+                    imgui.text(name)
+                    for column in ("p50_ms", "p95_ms", "max_ms"):
+                        imgui.table_next_column()
+                        imgui.text(f"{stats[column]:.2f}")
+                    imgui.table_next_column()
+                    imgui.text(str(stats["frames"]))
+                imgui.end_table()
+        imgui.end()
 
-                    if imgui.is_item_hovered() and imgui.is_mouse_double_clicked():
-                        self.trigger_edit_popup(key)
-                    elif clicked:
-                        current_index = self.filtered_flags.index(key)
+    def draw_flag_row(self, index: int, key: str):
+        rows = self.model.rows
+        code = rows.codes.get(key)
+        if code is None: return
 
-                        if imgui.get_io().key_shift and self.last_selected_index != -1:
+        imgui.table_next_row()
 
-                            start_index = min(self.last_selected_index, current_index)
-                            end_index = max(self.last_selected_index, current_index)
+        imgui.table_next_column()
+        available_width = imgui.get_content_region_available_width()
+        button_width = (available_width - imgui.get_style().item_spacing.x) / 0.96
 
-                            if not imgui.get_io().key_ctrl:
-                                self.selected_flags.clear()
+        imgui.push_id(key)
+        if imgui.button("Edit", width=button_width, height=0):
+            self.trigger_edit_popup(key)
+        imgui.pop_id()
 
-                            for i in range(start_index, end_index + 1):
-                                flag_key = self.filtered_flags[i]
-                                self.selected_flags[flag_key] = True
-                        elif imgui.get_io().key_ctrl:
+        imgui.table_next_column()
+        is_selected = code >= SELECTED
 
-                            self.selected_flags[key] = not is_selected
-                            self.last_selected_index = current_index
-                        else:
+        clicked, _ = imgui.selectable(key, is_selected)
 
-                            self.selected_flags.clear()
-                            self.selected_flags[key] = True
-                            self.last_selected_index = current_index
+        if imgui.is_item_hovered() and imgui.is_mouse_double_clicked():
+            self.trigger_edit_popup(key)
+        elif clicked:
+            self.select_flag_row(index, key, is_selected)
 
-                    imgui.table_next_column()
-                    imgui.text(flag_type)
+        imgui.table_next_column()
+        type_code = code & UNKNOWN_CODE
+        imgui.text(TYPE_NAMES[type_code] if type_code != UNKNOWN_CODE else self.model.flag_type(key))
 
-                    imgui.table_next_column()
-                    imgui.text(str(value))
+        imgui.table_next_column()
+        imgui.text(rows.display_text(key, self.flags[key]))
 
-                imgui.end_table()
+    def draw_group_tree_row(self, depth: int, path: GroupPath, key: Optional[str]):
+        if key is not None:
+            self.draw_flag_row(self.filtered_flags.index(key), key)
+            return
 
-            self.draw_add_popup()
-            self.draw_rename_popup()
-            self.draw_edit_popup()
-            self.draw_remove_popup()
-            self.draw_import_popup()
-            self.draw_export_popup()
-            self.draw_error_popup()
-            self.draw_refresh_popup()
+        tree = self.group_tree
+        imgui.table_next_row()
+        imgui.table_next_column()
+        imgui.table_next_column()
+        marker = "-" if tree.is_expanded(path) else "+"
+        label = f"{'    ' * depth}{marker} {tree.label(path)} ({tree.counts.get(path, 0)})##group/{'/'.join(path)}"
+        clicked, _ = imgui.selectable(label, False)
+        if clicked:
+            tree.toggle(path)
+
+    def select_flag_row(self, current_index: int, key: str, is_selected: bool):
+        io = imgui.get_io()
+        rows = self.model.rows
+        anchor_key = self.last_selected_key
+        if io.key_shift and anchor_key is not None and anchor_key in self.filtered_flags:
+            anchor_index = self.filtered_flags.index(anchor_key)
+
+            start_index = min(anchor_index, current_index)
+            end_index = max(anchor_index, current_index)
+
+            if not io.key_ctrl:
+                rows.clear_selection()
+
+            for flag_key in self.filtered_flags.islice(start_index, end_index + 1):
+                rows.select(flag_key)
+        elif io.key_ctrl:
+
+            rows.select(key, not is_selected)
+            self.last_selected_key = key
+        else:
 
-        imgui.end()
+            rows.clear_selection()
+            rows.select(key)
+            self.last_selected_key = key
 
     def schedule_autosave(self):
         self.autosave_scheduled_time = pygame.time.get_ticks() + AUTOSAVE_DELAY
 
-    def get_latest_roblox_version_with_player(self):
-        try:
-            versions_dir = os.path.join(os.environ["LOCALAPPDATA"], "Roblox", "Versions")
-            if not os.path.exists(versions_dir):
-                return None
-
-            version_folders = [
-                os.path.join(versions_dir, d)
-                for d in os.listdir(versions_dir)
-                if os.path.isdir(os.path.join(versions_dir, d))
-            ]
+    def schedule_search(self):
+        self.search_scheduled_time = pygame.time.get_ticks() + SEARCH_DEBOUNCE_DELAY
 
-            if not version_folders:
-                return None
-
-            version_folders.sort(key=os.path.getmtime, reverse=True)
-
-            for folder in version_folders:
-                exe_path = os.path.join(folder, "RobloxPlayerBeta.exe")
-                if os.path.exists(exe_path):
-                    return folder
+    def start_api(self, port: int):
+        from local_api import ApiServer, new_token
+        api = ApiServer(self.model, port=port, token=new_token(), on_call=self._post_wakeup)
+        try:
+            api.start()
+        except OSError as e:
+            self.trigger_error_popup("API Error", f"Could not start the local API on port {port}: {e}")
+            return
+        try:
+            api.write_info()
+        except OSError as e:
+            self.trigger_error_popup("API Error", f"The local API is running on {api.url} but its token could not be written: {e}")
+        self.api = api
+
+    def process_api_calls(self):
+        state = self.model.revision, self.flags_enabled
+        with self.profiler.section("api"):
+            added, removed = self.api.process(self.query_engine)
+        if (self.model.revision, self.flags_enabled) == state:
+            return
+        self._on_keys_removed(removed)
+        self._on_keys_added(added)
+        self._on_keys_changed()
+        if removed:
+            self.clear_selection()
+        if self.autosave_scheduled_time < 0:
+            self.schedule_autosave()
 
-            return None
+    def get_latest_roblox_version_with_player(self):
+        return find_latest_player_version(get_versions_dir())
 
-        except Exception:
+    def get_settings_path(self) -> Optional[str]:
+        if not self.known_latest_version_path:
             return None
+        return get_settings_path(self.known_latest_version_path)
 
     def load_flags(self):
-        if not self.known_latest_version_path:
-            self.flags = {}
-            self.flag_types = {}
+        settings_file_path = self.get_settings_path()
+        self.version_watcher.watch_file(settings_file_path)
+        if not settings_file_path:
+            self.model.replace_flags({})
             self.filter_flags()
             self.trigger_error_popup("Load Error", "Could not find Roblox version folder. Starting with no flags.")
             return
 
-        settings_file_path = os.path.join(
-            self.known_latest_version_path, "ClientSettings", "ClientAppSettings.json"
-        )
-
         try:
-            if os.path.exists(settings_file_path):
-                with open(settings_file_path, "r") as f:
-                    content = f.read()
-                    if content.strip():
-                        self.flags = json.loads(content)
-                        self.flags_enabled = True
-                    else: 
-                        self.flags_enabled = False
-            else: 
-                self.flags = {}
-                self.flags_enabled = True
-
-            self.flag_types = {}
-            for key, value in self.flags.items():
-                self.flag_types[key] = self._deduce_type(value)
-
+            self.model.load(settings_file_path)
             self.filter_flags()
         except Exception as e:
             self.trigger_error_popup("Error Loading Flags", f"Failed to load flags: {e}")
+            return
+
+        if self.backups is not None and os.path.exists(settings_file_path):
+            if not self.backups.has_source(source_name(settings_file_path)):
+                self.backup_file(settings_file_path, "original")
+
+    def reload_flags(self):
+        settings_file_path = self.get_settings_path()
+        if not settings_file_path or not self.model.is_unchanged_on_disk(settings_file_path):
+            with self.model.transaction("Refresh"):
+                self.load_flags()
+            return
+
+        with self.model.transaction("Refresh"):
+            self.model.restore_snapshot()
+        self.filter_flags()
 
     def save_flags(self):
         if not self.known_latest_version_path:
             self.trigger_error_popup("Save Error", "Could not find Roblox version folder. Cannot save.")
             return
 
-        try:
-            dst_dir = os.path.join(self.known_latest_version_path, "ClientSettings")
-            os.makedirs(dst_dir, exist_ok=True)
-
-            dst_path = os.path.join(dst_dir, "ClientAppSettings.json")
+        with self.profiler.section("save_flags"):
+            dst_path = self.get_settings_path()
+            self.save_writer.submit(dst_path, self.model.snapshot())
+            self.save_status = "Saving..."
 
-            with open(dst_path, "w") as f:
-                if self.flags_enabled:
-                    json.dump(self.flags, f, indent=2)
-                else:
-
-                    f.write("{}")
+    def filter_flags(self):
+        with self.profiler.section("filter_flags"):
+            self.active_search = self.search_text.strip()
+            self.search_error = ""
+            self.model.changed_keys = set()
+            if not self.active_search:
+                self.filtered_flags = self.model.sorted_keys
+            else:
+                try:
+                    self.filtered_flags = SortedList(self.query_engine.search(self.active_search))
+                except QueryError as e:
+                    self.search_error = str(e)
+                    self.filtered_flags = SortedList()
+
+            self._rebuild_group_tree()
+            self.clear_selection()
+
+    def _rebuild_group_tree(self):
+        if self.group_view:
+            expanded = self.group_tree.expanded if self.group_tree is not None else ()
+            self.group_tree = GroupTree(self.filtered_flags, expanded)
+
+    def set_group_view(self, enabled: bool):
+        self.group_view = enabled
+        self.group_tree = GroupTree(self.filtered_flags) if enabled else None
+
+    def clear_selection(self):
+        self.model.rows.clear_selection()
+        self.last_selected_key = None
+
+    def select_all(self):
+        if self.filtered_flags is self.model.sorted_keys:
+            self.model.rows.select_all()
+        else:
+            self.model.rows.select_many(self.filtered_flags)
+        self.last_selected_key = None
+
+    def apply_batch(self, batch: Batch, label: str):
+        with self.model.transaction(label):
+            added, removed = self.model.apply_batch(batch.updates, batch.removals)
+        self._on_history_applied(added, removed)
+
+    def _on_history_applied(self, added: List[str], removed: List[str]):
+        self._on_keys_removed(removed)
+        self._on_keys_added(added)
+        self._on_keys_changed()
+        if added or removed:
+            self.clear_selection()
+        self.schedule_autosave()
+
+    def undo(self):
+        result = self.model.undo()
+        if result is not None:
+            self._on_history_applied(result[1], result[2])
+            self.save_status = f"Undid {result[0]}"
+
+    def redo(self):
+        result = self.model.redo()
+        if result is not None:
+            self._on_history_applied(result[1], result[2])
+            self.save_status = f"Redid {result[0]}"
+
+    def report_dropped_undo(self):
+        journal = self.model.journal
+        if not journal.dropped:
+            return
+        labels, journal.dropped = journal.dropped, []
+        self.trigger_error_popup(
+            "Undo Unavailable",
+            f"'{labels[-1]}' changed too much to fit in the {journal.memory_limit // (1024 * 1024)} MiB undo history "
+            "and can't be undone. Earlier steps are kept; start with a higher --undo-limit to undo changes this big.",
+        )
 
+    def handle_shortcuts(self):
+        io = imgui.get_io()
+        if not io.key_ctrl or io.want_text_input:
+            return
+        if imgui.is_key_pressed(imgui.get_key_index(imgui.KEY_Z)) and not io.key_shift:
+            self.undo()
+        elif imgui.is_key_pressed(imgui.get_key_index(imgui.KEY_Z)):
+            self.redo()
+        elif imgui.is_key_pressed(imgui.get_key_index(imgui.KEY_Y)):
+            self.redo()
+
+    def _on_keys_added(self, keys: Iterable[str]):
+        if self.filtered_flags is not self.model.sorted_keys:
+            keys = [] if self.search_error else [key for key in keys if key not in self.filtered_flags and self.query_engine.matches(self.active_search, key)]
+            self.filtered_flags.update(keys)
+        if self.group_tree is not None:
+            self.group_tree.add_many(keys)
+
+    def _on_keys_removed(self, keys: Iterable[str]):
+        if self.filtered_flags is not self.model.sorted_keys:
+            keys = [key for key in keys if key in self.filtered_flags]
+            for key in keys:
+                self.filtered_flags.remove(key)
+        if self.group_tree is not None:
+            self.group_tree.remove_many(keys)
+
+    def _on_keys_changed(self):
+        keys, self.model.changed_keys = self.model.changed_keys, set()
+        if not keys or self.filtered_flags is self.model.sorted_keys or self.search_error:
+            return
+        if not self.query_engine.reads_values(self.active_search):
+            return
+        keys = [key for key in keys if key in self.flags]
+        if len(keys) > REFILTER_KEY_LIMIT:
+            matched = self.query_engine.search(self.active_search)
+            matched_set = set(matched)
+            for key in keys:
+                if key not in matched_set:
+                    self.model.rows.select(key, False)
+            self.filtered_flags = SortedList(matched)
+            self._rebuild_group_tree()
+            return
+        matches = self.query_engine.matches
+        stale = [key for key in keys if key in self.filtered_flags and not matches(self.active_search, key)]
+        for key in stale:
+            self.model.rows.select(key, False)
+        self._on_keys_removed(stale)
+        self._on_keys_added(keys)
+
+    def _set_flag(self, key: str, value: Any, flag_type: str):
+        if self.model.set_flag(key, value, flag_type):
+            self._on_keys_added((key,))
+        self._on_keys_changed()
+
+    def _remove_flag(self, key: str):
+        if self.model.remove_flag(key):
+            self._on_keys_removed((key,))
+
+    def load_catalog(self, path: str):
+        try:
+            self.catalog = FlagCatalog(path)
         except Exception as e:
-            self.trigger_error_popup("Error Saving Flags", f"Failed to save flags: {e}")
+            self.catalog = None
+            self.trigger_error_popup("Catalog Error", f"Could not load flag catalog: {e}")
 
-    def filter_flags(self):
-        search_lower = self.search_text.lower()
-        if not search_lower:
-            self.filtered_flags = sorted(self.flags.keys())
-        else:
-            self.filtered_flags = sorted([k for k in self.flags if search_lower in k.lower()])
-
-        self.selected_flags.clear()
-        self.last_selected_index = -1
-
-    def _deduce_type(self, value: Any) -> str:
-        if isinstance(value, bool): return "bool"
-        if isinstance(value, int): return "int"
-        if isinstance(value, str):
-            if value.lower() in ("true", "false"): return "bool"
-            if value.isdigit() or (value.startswith("-") and value[1:].isdigit()): return "int"
-        return "string"
-
-    def _validate_value(self, flag_type: str, value: str) -> bool:
-        if flag_type == "bool": return value.lower() in ("true", "false")
-        if flag_type == "int":
-            try: int(value); return True
-            except ValueError: return False
-        return True
+    def draw_catalog_suggestions(self, name: str) -> Optional[CatalogEntry]:
+        name = name.strip()
+        if self.catalog is None or not name:
+            return None
 
-    def _convert_value(self, flag_type: str, value: str) -> Any:
-        if flag_type == "bool": return value.lower() == "true"
-        if flag_type == "int": return int(value)
-        return value
+        if name != self.suggestion_query:
+            self.suggestion_query = name
+            self.suggestions = [entry for entry in self.catalog.suggest(name) if entry[0] != name]
+        if not self.suggestions:
+            return None
+
+        picked = None
+        visible_rows = min(len(self.suggestions), 6)
+        imgui.begin_child("##suggestions", 0, visible_rows * imgui.get_text_line_height_with_spacing() + 8, border=True)
+        for entry in self.suggestions:
+            clicked, _ = imgui.selectable(f"{entry[0]}  ({entry[1]})", False)
+            if clicked:
+                picked = entry
+        imgui.end_child()
+        return picked
 
     def trigger_add_popup(self):
         self.popup_add_name, self.popup_add_value = "", ""
@@ -336,17 +777,24 @@ class FastFlagEditorApp:
         self.popup_edit_new_name = key
         self.popup_edit_value = str(self.flags[key])
         try:
-            self.popup_edit_type_idx = self.flag_type_options.index(self.flag_types[key])
+            self.popup_edit_type_idx = self.flag_type_options.index(self.model.flag_type(key))
         except (ValueError, KeyError):
             self.popup_edit_type_idx = self.flag_type_options.index("string")
         self.show_edit_popup = True
 
     def trigger_remove_popup(self):
-        if not any(self.selected_flags.values()):
+        if not self.model.rows.selected_count:
             self.trigger_error_popup("No Selection", "Please select one or more flags to remove.")
             return
         self.show_remove_popup = True
 
+    def trigger_bulk_popup(self):
+        if not self.filtered_flags:
+            self.trigger_error_popup("No Flags", "There are no flags to edit.")
+            return
+        self.popup_bulk_scope = 0 if self.model.rows.selected_count else 1
+        self.show_bulk_popup = True
+
     def trigger_import_popup(self):
         self.popup_import_text = ""
         self.show_import_popup = True
@@ -355,9 +803,251 @@ class FastFlagEditorApp:
         self.show_refresh_popup = True
 
     def trigger_export_popup(self):
-        self.popup_export_text = json.dumps(self.flags, indent=2)
+        if self.popup_export_revision != self.model.revision:
+            if self.export_preview_job is not None:
+                self.export_preview_job.cancel()
+            self.popup_export_text = ""
+            self.popup_export_revision = self.model.revision
+            self.export_preview_job = start_export_text(self.flags.copy(), on_complete=self._post_wakeup)
         self.show_export_popup = True
 
+    def finish_export_preview(self):
+        job, self.export_preview_job = self.export_preview_job, None
+        self.profiler.add("export_preview", job.elapsed)
+        if job.error is None:
+            self.popup_export_text = job.text
+        elif not isinstance(job.error, TransferCancelled):
+            self.popup_export_revision = -1
+            self.trigger_error_popup("Export Error", f"Could not build the export preview: {job.error}")
+
+    def start_file_import(self, path: str, overwrite: bool) -> bool:
+        if self.transfer_job is not None:
+            self.trigger_error_popup("Busy", "Another import or export is still running.")
+            return False
+        if not os.path.isfile(path):
+            self.trigger_error_popup("Import Error", f"File not found: {path}")
+            return False
+        self.transfer_job = start_import(path, overwrite, on_complete=self._post_wakeup)
+        return True
+
+    def start_file_export(self, path: str) -> bool:
+        if self.transfer_job is not None:
+            self.trigger_error_popup("Busy", "Another import or export is still running.")
+            return False
+        self.transfer_job = start_export(path, self.flags.copy(), on_complete=self._post_wakeup)
+        return True
+
+    def finish_transfer(self):
+        job, self.transfer_job = self.transfer_job, None
+        self.profiler.add(f"{job.kind}_file", job.elapsed)
+        if isinstance(job.error, TransferCancelled):
+            self.save_status = f"{job.kind.capitalize()} cancelled"
+        elif isinstance(job.error, json.JSONDecodeError):
+            self.trigger_error_popup("Import Error", f"Invalid JSON format: {job.error}")
+        elif job.error is not None:
+            self.trigger_error_popup(f"{job.kind.capitalize()} Error", f"Failed to {job.kind} flags: {job.error}")
+        elif job.kind == "import":
+            self.apply_import(job.flags, job.overwrite)
+        else:
+            self.trigger_error_popup("Export Successful", f"Exported {job.count} flag(s) to {job.path}")
+
+    def apply_import(self, flags: Dict[str, Tuple[Any, str]], overwrite: bool):
+        with self.model.transaction("Import"):
+            added_keys = self.model.import_flags(flags, overwrite)
+        if overwrite:
+            self.filter_flags()
+        else:
+            self._on_keys_added(added_keys)
+            self._on_keys_changed()
+            self.clear_selection()
+        self.schedule_autosave()
+
+        action = "Overwritten" if overwrite else "Merged"
+        self.trigger_error_popup("Import Successful", f"{action} {len(flags)} flag(s) successfully!")
+
+    def backup_saved_flags(self, path: str, flags: Dict[str, Any]):
+        self.backups.add(flags, "save", source_name(path))
+
+    def backup_file(self, path: str, reason: str):
+        if self.backups is None:
+            return
+        try:
+            self.backups.add_file(path, reason, source_name(path))
+        except (OSError, ValueError) as e:
+            self.trigger_error_popup("Backup Error", f"Could not back up {path}: {e}")
+
+    def trigger_backups_popup(self):
+        if self.backups is None:
+            self.trigger_error_popup("Backups", "No backup folder is available because LOCALAPPDATA is not set.")
+            return
+        self.popup_backup_list = self.backups.snapshots()[::-1]
+        self.popup_backup_idx = 0 if self.popup_backup_list else -1
+        self.popup_backup_diff = ""
+        self.show_backups_popup = True
+
+    def load_backup(self, snapshot: Snapshot) -> Optional[Dict[str, Any]]:
+        try:
+            return self.backups.load(snapshot.id)
+        except (OSError, ValueError) as e:
+            self.trigger_error_popup("Backup Error", f"Could not read backup #{snapshot.id}: {e}")
+            return None
+
+    def restore_backup(self, snapshot: Snapshot) -> bool:
+        flags = self.load_backup(snapshot)
+        if flags is None:
+            return False
+        with self.model.transaction("Restore Backup"):
+            self.model.replace_flags(flags)
+        self.flags_enabled = True
+        self.filter_flags()
+        self.schedule_autosave()
+        self.save_status = f"Restored backup #{snapshot.id}"
+        return True
+
+    def diff_backup(self, snapshot: Snapshot):
+        flags = self.load_backup(snapshot)
+        if flags is None:
+            return
+        lines = diff_flags(self.flags, flags)
+        if not lines:
+            self.popup_backup_diff = "No differences."
+            return
+        text = "\n".join(lines[:BACKUP_DIFF_LIMIT])
+        if len(lines) > BACKUP_DIFF_LIMIT:
+            text += f"\n... and {len(lines) - BACKUP_DIFF_LIMIT} more"
+        self.popup_backup_diff = text
+
+    def trigger_profiles_popup(self):
+        if self.profiles is None:
+            self.trigger_error_popup("Profiles", "No profile store is available because LOCALAPPDATA is not set.")
+            return
+        if self.refresh_profile_list():
+            self.popup_profile_name = self.active_profile
+            self.show_profiles_popup = True
+
+    def refresh_profile_list(self) -> bool:
+        try:
+            self.popup_profile_list = self.profiles.profiles()
+        except (OSError, sqlite3.Error) as e:
+            self.trigger_error_popup("Profile Error", f"Could not open the profile store: {e}")
+            return False
+        names = [profile.name.lower() for profile in self.popup_profile_list]
+        active = self.active_profile.lower()
+        self.popup_profile_idx = names.index(active) if active in names else (0 if names else -1)
+        self.popup_profile_preview = ""
+        return True
+
+    def save_profile(self, name: str) -> bool:
+        try:
+            profile, changed = self.profiles.save_model(name, self.model)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.trigger_error_popup("Profile Error", f"Could not save profile: {e}")
+            return False
+        self.active_profile = profile.name
+        self.save_status = f"Saved profile '{profile.name}' ({changed} change(s))"
+        return self.refresh_profile_list()
+
+    def profile_batch(self, profile: Profile) -> Optional[Batch]:
+        try:
+            return replace_batch(self.model, self.profiles.entries(profile.name))
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.trigger_error_popup("Profile Error", f"Could not read profile '{profile.name}': {e}")
+            return None
+
+    def preview_profile(self, profile: Profile):
+        batch = self.profile_batch(profile)
+        if batch is None:
+            return
+        added = sum(key not in self.flags for key in batch.updates)
+        self.popup_profile_preview = (f"Switching adds {added}, changes {len(batch.updates) - added} "
+                                      f"and removes {len(batch.removals)} flag(s).")
+
+    def switch_profile(self, profile: Profile) -> bool:
+        batch = self.profile_batch(profile)
+        if batch is None:
+            return False
+        if batch:
+            self.apply_batch(batch, f"Switch to {profile.name}")
+        self.active_profile = profile.name
+        if not self.flags_enabled:
+            self.flags_enabled = True
+            self.schedule_autosave()
+        self.save_status = f"Switched to '{profile.name}' ({len(batch.updates) + len(batch.removals)} change(s))"
+        return True
+
+    def delete_profile(self, profile: Profile):
+        try:
+            self.profiles.delete(profile.name)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            self.trigger_error_popup("Profile Error", f"Could not delete profile: {e}")
+            return
+        if self.active_profile.lower() == profile.name.lower():
+            self.active_profile = ""
+        self.refresh_profile_list()
+
+    def trigger_compare_popup(self):
+        sources = [CompareSource("Current flags")]
+        settings_path = self.get_settings_path()
+        if settings_path:
+            sources.append(CompareSource("Saved file", settings_path))
+        sources += version_sources(get_versions_dir())
+        sources.append(CompareSource("JSON file..."))
+        self.popup_compare_sources = sources
+        self.popup_compare_left_idx = min(self.popup_compare_left_idx, len(sources) - 1)
+        self.popup_compare_right_idx = min(self.popup_compare_right_idx, len(sources) - 1)
+        self.show_compare_popup = True
+
+    def compare_source(self, index: int, path: str) -> Optional[CompareSource]:
+        source = self.popup_compare_sources[index]
+        if index == 0:
+            return CompareSource(source.label, flags=self.model.flags.copy(), current=True)
+        if source.path is not None:
+            return source
+        path = path.strip().strip('"')
+        if not os.path.isfile(path):
+            self.trigger_error_popup("Compare Error", f"File not found: {path}")
+            return None
+        return CompareSource(os.path.basename(path), path)
+
+    def start_compare_job(self):
+        if self.compare_job is not None:
+            return
+        left = self.compare_source(self.popup_compare_left_idx, self.popup_compare_paths[0])
+        right = self.compare_source(self.popup_compare_right_idx, self.popup_compare_paths[1])
+        if left is None or right is None:
+            return
+        self.compare_job = start_compare(left, right, on_complete=self._post_wakeup)
+
+    def finish_compare(self):
+        job, self.compare_job = self.compare_job, None
+        self.profiler.add("compare", job.elapsed)
+        if isinstance(job.error, TransferCancelled):
+            return
+        if job.error is not None:
+            self.trigger_error_popup("Compare Error", f"Could not compare {job.path}: {job.error}")
+            return
+        self.compare_diff = job.diff
+        self.compare_labels = job.left.label, job.right.label
+        self.compare_from_left = job.right.current and not job.left.current
+        self.compare_selected.intersection_update(job.diff.keys)
+
+    def apply_compare_selection(self):
+        diff = self.compare_diff
+        keys = [key for key in diff.keys if key in self.compare_selected]
+        if not keys:
+            self.trigger_error_popup("No Selection", "Tick the changes to apply first.")
+            return
+        batch = diff.batch(self.model, keys, self.compare_from_left)
+        self.compare_selected.clear()
+        label = self.compare_labels[0 if self.compare_from_left else 1]
+        if not batch:
+            self.save_status = f"Nothing to apply from {label}"
+            return
+        self.apply_batch(batch, "Apply Compare")
+        self.save_status = f"Applied {len(batch.updates) + len(batch.removals)} change(s) from {label}"
+        if self.popup_compare_left_idx == 0 or self.popup_compare_right_idx == 0:
+            self.start_compare_job()
+
     def trigger_error_popup(self, title: str, message: str):
         self.error_popup_title = title
         self.error_popup_message = message
@@ -370,6 +1060,11 @@ class FastFlagEditorApp:
 
         if imgui.begin_popup_modal("Add Flag", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
             _, self.popup_add_name = imgui.input_text("Name", self.popup_add_name, 256)
+            picked = self.draw_catalog_suggestions(self.popup_add_name)
+            if picked:
+                self.popup_add_name = picked[0]
+                self.popup_add_type_idx = self.flag_type_options.index(picked[1])
+                self.popup_add_value = picked[2]
             _, self.popup_add_type_idx = imgui.combo("Type", self.popup_add_type_idx, self.flag_type_options)
             _, self.popup_add_value = imgui.input_text("Value", self.popup_add_value, 256)
             imgui.separator()
@@ -379,12 +1074,12 @@ class FastFlagEditorApp:
                     self.trigger_error_popup("Invalid Input", "Flag name cannot be empty.")
                 elif name in self.flags:
                     self.trigger_error_popup("Invalid Input", "A flag with this name already exists.")
-                elif not self._validate_value(type_str, value_str):
+                elif not validate_value(type_str, value_str):
                     self.trigger_error_popup("Invalid Input", f"Value '{value_str}' is not a valid {type_str}.")
                 else:
-                    self.flags[name] = self._convert_value(type_str, value_str)
-                    self.flag_types[name] = type_str
-                    self.filter_flags()
+                    with self.model.transaction("Add flag"):
+                        self._set_flag(name, convert_value(type_str, value_str), type_str)
+                    self.clear_selection()
                     self.schedule_autosave()
                     imgui.close_current_popup()
             imgui.same_line()
@@ -411,12 +1106,11 @@ class FastFlagEditorApp:
                     self.trigger_error_popup("Invalid Input", "A flag with this name already exists.")
                 else:
 
-                    self.flags[new_name] = self.flags.pop(self.popup_rename_old_name)
-                    self.flag_types[new_name] = self.flag_types.pop(self.popup_rename_old_name)
-                    if self.selected_flags.get(self.popup_rename_old_name, False):
-                        self.selected_flags.pop(self.popup_rename_old_name, None)
-                        self.selected_flags[new_name] = True
-                    self.filter_flags()
+                    old_name = self.popup_rename_old_name
+                    with self.model.transaction("Rename flag"):
+                        self._set_flag(new_name, self.flags[old_name], self.model.flag_type(old_name))
+                        self._remove_flag(old_name)
+                    self.clear_selection()
                     self.schedule_autosave()
                     imgui.close_current_popup()
             imgui.same_line()
@@ -431,6 +1125,10 @@ class FastFlagEditorApp:
 
         if imgui.begin_popup_modal("Edit Flag", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
             _, self.popup_edit_new_name = imgui.input_text("Name", self.popup_edit_new_name, 256)
+            picked = self.draw_catalog_suggestions(self.popup_edit_new_name)
+            if picked:
+                self.popup_edit_new_name = picked[0]
+                self.popup_edit_type_idx = self.flag_type_options.index(picked[1])
             _, self.popup_edit_type_idx = imgui.combo("Type", self.popup_edit_type_idx, self.flag_type_options)
             _, self.popup_edit_value = imgui.input_text("Value", self.popup_edit_value, 256)
             imgui.separator()
@@ -440,24 +1138,19 @@ class FastFlagEditorApp:
 
                 if not new_name:
                     self.trigger_error_popup("Invalid Input", "Flag name cannot be empty.")
-                elif not self._validate_value(type_str, value_str):
+                elif not validate_value(type_str, value_str):
                     self.trigger_error_popup("Invalid Input", f"Value '{value_str}' is not a valid {type_str}.")
                 elif new_name != self.popup_edit_name and new_name in self.flags:
                     self.trigger_error_popup("Invalid Input", "A flag with this name already exists.")
                 else:
 
-                    if new_name != self.popup_edit_name:
+                    with self.model.transaction("Edit flag"):
+                        if new_name != self.popup_edit_name:
 
-                        self.flags.pop(self.popup_edit_name, None)
-                        self.flag_types.pop(self.popup_edit_name, None)
+                            self._remove_flag(self.popup_edit_name)
 
-                        if self.selected_flags.get(self.popup_edit_name, False):
-                            self.selected_flags.pop(self.popup_edit_name, None)
-                            self.selected_flags[new_name] = True
-
-                    self.flags[new_name] = self._convert_value(type_str, value_str)
-                    self.flag_types[new_name] = type_str
-                    self.filter_flags()
+                        self._set_flag(new_name, convert_value(type_str, value_str), type_str)
+                    self.clear_selection()
                     self.schedule_autosave()
                     imgui.close_current_popup()
             imgui.same_line()
@@ -471,21 +1164,81 @@ class FastFlagEditorApp:
             self.show_remove_popup = False
 
         if imgui.begin_popup_modal("Confirm Removal", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
-            keys_to_remove = [k for k, v in self.selected_flags.items() if v]
-            imgui.text(f"Are you sure you want to remove {len(keys_to_remove)} flag(s)?")
+            imgui.text(f"Are you sure you want to remove {self.model.rows.selected_count} flag(s)?")
             imgui.separator()
             if imgui.button("Yes, Remove"):
-                for key in keys_to_remove:
-                    self.flags.pop(key, None)
-                    self.flag_types.pop(key, None)
-                self.filter_flags()
-                self.schedule_autosave()
+                self.apply_batch(delete_batch(self.model, self.model.rows.selected_keys()), "Remove flags")
                 imgui.close_current_popup()
             imgui.same_line()
             if imgui.button("Cancel"):
                 imgui.close_current_popup()
             imgui.end_popup()
 
+    def perform_bulk_operation(self) -> bool:
+        rows = self.model.rows
+        keys = rows.selected_keys() if self.popup_bulk_scope == 0 else list(self.filtered_flags)
+        if not keys:
+            self.trigger_error_popup("No Selection", "Please select one or more flags to edit.")
+            return False
+
+        operation = BULK_OPERATIONS[self.popup_bulk_op_idx]
+        type_str = self.flag_type_options[self.popup_bulk_type_idx]
+        try:
+            if operation == "Set Value":
+                batch = set_value_batch(self.model, keys, type_str, self.popup_bulk_value.strip())
+            elif operation == "Toggle Bools":
+                batch = toggle_bools_batch(self.model, keys)
+            elif operation == "Change Type":
+                batch = change_type_batch(self.model, keys, type_str)
+            elif operation == "Rename":
+                batch = rename_batch(self.model, keys, self.popup_bulk_pattern, self.popup_bulk_replacement, self.popup_bulk_regex)
+            else:
+                batch = delete_batch(self.model, keys)
+        except (ValueError, re.error) as e:
+            self.trigger_error_popup("Invalid Input", str(e))
+            return False
+
+        self.apply_batch(batch, operation)
+        changed = len(batch.removals) if operation in ("Rename", "Delete") else len(batch.updates)
+        message = f"{operation}: changed {changed} flag(s)."
+        if batch.skipped:
+            message += f"\nSkipped {len(batch.skipped)} flag(s) that did not apply."
+        self.trigger_error_popup("Bulk Edit", message)
+        return True
+
+    def draw_bulk_popup(self):
+        if self.show_bulk_popup:
+            imgui.open_popup("Bulk Edit Flags")
+            self.show_bulk_popup = False
+
+        if imgui.begin_popup_modal("Bulk Edit Flags", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
+            if imgui.radio_button(f"Selected ({self.model.rows.selected_count})", self.popup_bulk_scope == 0):
+                self.popup_bulk_scope = 0
+            imgui.same_line()
+            if imgui.radio_button(f"Search results ({len(self.filtered_flags)})", self.popup_bulk_scope == 1):
+                self.popup_bulk_scope = 1
+
+            _, self.popup_bulk_op_idx = imgui.combo("Operation", self.popup_bulk_op_idx, BULK_OPERATIONS)
+            operation = BULK_OPERATIONS[self.popup_bulk_op_idx]
+            if operation in ("Set Value", "Change Type"):
+                _, self.popup_bulk_type_idx = imgui.combo("Type", self.popup_bulk_type_idx, self.flag_type_options)
+            if operation == "Set Value":
+                _, self.popup_bulk_value = imgui.input_text("Value", self.popup_bulk_value, 256)
+            elif operation == "Rename":
+                _, self.popup_bulk_pattern = imgui.input_text("Find", self.popup_bulk_pattern, 256)
+                _, self.popup_bulk_replacement = imgui.input_text("Replace", self.popup_bulk_replacement, 256)
+                _, self.popup_bulk_regex = imgui.checkbox("Regular expression", self.popup_bulk_regex)
+                if not self.popup_bulk_regex:
+                    imgui.text("Replaces the Find prefix at the start of each name.")
+            imgui.separator()
+            if imgui.button("Apply"):
+                if self.perform_bulk_operation():
+                    imgui.close_current_popup()
+            imgui.same_line()
+            if imgui.button("Cancel"):
+                imgui.close_current_popup()
+            imgui.end_popup()
+
     def draw_import_popup(self):
         if self.show_import_popup:
             imgui.open_popup("Import Flags")
@@ -498,39 +1251,10 @@ class FastFlagEditorApp:
 
             def perform_import(overwrite: bool):
                 try:
-                    imported_data = json.loads(self.popup_import_text.strip() or "{}")
-                    if not isinstance(imported_data, dict):
-                        raise TypeError("Imported JSON is not a dictionary.")
-
-                    processed_data = {}
-                    for key, value in imported_data.items():
-                        if isinstance(value, str):
-                            if value.lower() in ("true", "false"):
-                                processed_data[key] = value.lower() == "true"
-                            elif value.isdigit() or (value.startswith("-") and value[1:].isdigit()):
-                                processed_data[key] = int(value)
-                            else:
-                                processed_data[key] = value
-                        else:
-                            processed_data[key] = value
-
-                    if overwrite:
-                        self.flags.clear()
-                        self.flag_types.clear()
-
-                    self.flags.update(processed_data)
-
-                    for key, value in processed_data.items():
-                        self.flag_types[key] = self._deduce_type(value)
-
-                    self.filter_flags()
-                    self.schedule_autosave()
+                    processed_data = parse_flags_json(self.popup_import_text)
+                    self.apply_import(processed_data, overwrite)
                     imgui.close_current_popup()
 
-                    flag_count = len(processed_data)
-                    action = "Overwritten" if overwrite else "Merged"
-                    self.trigger_error_popup("Import Successful", f"{action} {flag_count} flag(s) successfully!")
-
                 except json.JSONDecodeError as e:
                     self.trigger_error_popup("Import Error", f"Invalid JSON format: {str(e)}")
                 except Exception as e:
@@ -544,6 +1268,17 @@ class FastFlagEditorApp:
             imgui.same_line()
             if imgui.button("Cancel"):
                 imgui.close_current_popup()
+
+            imgui.separator()
+            imgui.text("Or import from a file:")
+            _, self.popup_import_path = imgui.input_text("Path##importpath", self.popup_import_path, 1024)
+            if imgui.button("Merge File"):
+                if self.start_file_import(self.popup_import_path.strip(), overwrite=False):
+                    imgui.close_current_popup()
+            imgui.same_line()
+            if imgui.button("Overwrite File"):
+                if self.start_file_import(self.popup_import_path.strip(), overwrite=True):
+                    imgui.close_current_popup()
             imgui.end_popup()
 
     def draw_refresh_popup(self):
@@ -553,12 +1288,12 @@ class FastFlagEditorApp:
 
         if imgui.begin_popup_modal("Confirm Refresh", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
             imgui.text("Are you sure you want to refresh?")
-            imgui.text("This will reload all flags from the file and")
-            imgui.text("discard any unsaved changes.")
+            imgui.text("This will reload all flags from the file.")
+            imgui.text("Use Undo to get unsaved changes back.")
             imgui.separator()
 
             if imgui.button("Yes, Refresh"):
-                self.load_flags()
+                self.reload_flags()
                 imgui.close_current_popup()
             imgui.same_line()
             if imgui.button("Cancel"):
@@ -571,16 +1306,214 @@ class FastFlagEditorApp:
             self.show_export_popup = False
 
         if imgui.begin_popup_modal("Export Flags", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
-            imgui.text("Copy the JSON content below:")
-            imgui.input_text_multiline("##exportjson", self.popup_export_text, -1, 300, flags=imgui.INPUT_TEXT_READ_ONLY)
+            job = self.export_preview_job
+            if job is not None:
+                imgui.text(f"Preparing JSON... {job.progress:.0%}")
+            elif len(self.popup_export_text) > EXPORT_PREVIEW_LIMIT:
+                imgui.text(f"{len(self.flags)} flag(s) is too much to preview. Copy them or save them to a file.")
+            else:
+                imgui.text("Copy the JSON content below:")
+                imgui.input_text_multiline("##exportjson", self.popup_export_text, -1, 300, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.separator()
+            if job is None:
+                if imgui.button("Copy to Clipboard"):
+                    imgui.set_clipboard_text(self.popup_export_text)
+                imgui.same_line()
+            if imgui.button("Close"):
+                imgui.close_current_popup()
+
             imgui.separator()
-            if imgui.button("Copy to Clipboard"):
-                imgui.set_clipboard_text(self.popup_export_text)
+            _, self.popup_export_path = imgui.input_text("Path##exportpath", self.popup_export_path, 1024)
+            if imgui.button("Save to File") and self.popup_export_path.strip():
+                if self.start_file_export(self.popup_export_path.strip()):
+                    imgui.close_current_popup()
+            imgui.end_popup()
+
+    def draw_backups_popup(self):
+        if self.show_backups_popup:
+            imgui.open_popup("Backups")
+            self.show_backups_popup = False
+
+        if imgui.begin_popup_modal("Backups", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
+            snapshots = self.popup_backup_list
+            imgui.text(f"{len(snapshots)} backup(s), newest first:")
+            imgui.begin_child("##backups", 640, 240, border=True)
+            if self.virtualize_table:
+                clipper = imgui.ListClipper()
+                clipper.begin(len(snapshots))
+                while clipper.step():
+                    for index in range(clipper.display_start, clipper.display_end):
+                        self.draw_backup_row(index, snapshots[index])
+                clipper.end()
+            else:
+                for index, snapshot in enumerate(snapshots):
+                    self.draw_backup_row(index, snapshot)
+            imgui.end_child()
+
+            selected = snapshots[self.popup_backup_idx] if 0 <= self.popup_backup_idx < len(snapshots) else None
+            if self.popup_backup_diff:
+                imgui.text("Changes from the current flags to this backup:")
+                imgui.input_text_multiline("##backupdiff", self.popup_backup_diff, -1, 200, flags=imgui.INPUT_TEXT_READ_ONLY)
+            imgui.separator()
+            if imgui.button("Restore") and selected is not None:
+                if self.restore_backup(selected):
+                    imgui.close_current_popup()
+            imgui.same_line()
+            if imgui.button("Show Diff") and selected is not None:
+                self.diff_backup(selected)
             imgui.same_line()
             if imgui.button("Close"):
                 imgui.close_current_popup()
             imgui.end_popup()
 
+    def draw_backup_row(self, index: int, snapshot: Snapshot):
+        clicked, _ = imgui.selectable(snapshot.describe(), index == self.popup_backup_idx)
+        if clicked:
+            self.popup_backup_idx = index
+            self.popup_backup_diff = ""
+
+    def draw_profiles_popup(self):
+        if self.show_profiles_popup:
+            imgui.open_popup("Profiles")
+            self.show_profiles_popup = False
+
+        if imgui.begin_popup_modal("Profiles", flags=imgui.WINDOW_ALWAYS_AUTO_RESIZE)[0]:
+            profiles = self.popup_profile_list
+            imgui.text(f"{len(profiles)} profile(s):")
+            imgui.begin_child("##profiles", 640, 200, border=True)
+            for index, profile in enumerate(profiles):
+                label = ("* " if profile.name.lower() == self.active_profile.lower() else "  ") + profile.describe()
+                clicked, _ = imgui.selectable(f"{label}##profile{profile.id}", index == self.popup_profile_idx)
+                if clicked:
+                    self.popup_profile_idx = index
+                    self.preview_profile(profile)
+            imgui.end_child()
+
+            selected = profiles[self.popup_profile_idx] if 0 <= self.popup_profile_idx < len(profiles) else None
+            if self.popup_profile_preview:
+                imgui.text(self.popup_profile_preview)
+            imgui.separator()
+            if imgui.button("Switch") and selected is not None:
+                if self.switch_profile(selected):
+                    imgui.close_current_popup()
+            imgui.same_line()
+            if imgui.button("Update From Current") and selected is not None:
+                self.save_profile(selected.name)
+            imgui.same_line()
+            if imgui.button("Delete") and selected is not None:
+                self.delete_profile(selected)
+
+            _, self.popup_profile_name = imgui.input_text("Name##profilename", self.popup_profile_name, 128)
+            imgui.same_line()
+            if imgui.button("Save Current As"):
+                self.save_profile(self.popup_profile_name)
+            imgui.separator()
+            if imgui.button("Close"):
+                imgui.close_current_popup()
+            imgui.end_popup()
+
+    def draw_compare_popup(self):
+        if self.show_compare_popup:
+            imgui.open_popup("Compare")
+            self.show_compare_popup = False
+
+        imgui.set_next_window_size(900, 600, imgui.FIRST_USE_EVER)
+        if imgui.begin_popup_modal("Compare")[0]:
+            sources = self.popup_compare_sources
+            labels = [source.label for source in sources]
+            for side, name in enumerate(("Left", "Right")):
+                index = self.popup_compare_left_idx if side == 0 else self.popup_compare_right_idx
+                imgui.set_next_item_width(300)
+                _, index = imgui.combo(name, index, labels)
+                if side == 0:
+                    self.popup_compare_left_idx = index
+                else:
+                    self.popup_compare_right_idx = index
+                if index == len(sources) - 1:
+                    imgui.same_line()
+                    imgui.set_next_item_width(-1)
+                    _, self.popup_compare_paths[side] = imgui.input_text(f"##comparepath{side}", self.popup_compare_paths[side], 512)
+
+            job = self.compare_job
+            if job is not None:
+                imgui.progress_bar(job.progress, (200, 0), f"Comparing {job.progress * 100:.0f}%")
+                imgui.same_line()
+                if imgui.button("Cancel##compare"): job.cancel()
+            elif imgui.button("Compare"):
+                self.start_compare_job()
+
+            diff = self.compare_diff
+            if diff is not None:
+                left_label, right_label = self.compare_labels
+                imgui.same_line()
+                imgui.text(f"{left_label} -> {right_label}: {len(diff.added)} added, "
+                           f"{len(diff.removed)} removed, {len(diff.changed)} changed")
+                for kind in DIFF_KINDS:
+                    toggled, shown = imgui.checkbox(kind.capitalize(), kind in self.compare_kinds)
+                    if toggled:
+                        if shown:
+                            self.compare_kinds.add(kind)
+                        else:
+                            self.compare_kinds.discard(kind)
+                    imgui.same_line()
+                rows = diff.filtered(self.compare_kinds)
+                imgui.text(f"{len(rows)} shown, {len(self.compare_selected)} ticked")
+
+                table_flags = (imgui.TABLE_BORDERS | imgui.TABLE_RESIZABLE | imgui.TABLE_SCROLL_Y |
+                               imgui.TABLE_SIZING_STRETCH_PROP)
+                footer_height = imgui.get_frame_height_with_spacing() + imgui.get_style().item_spacing.y
+                if imgui.begin_table("CompareTable", 4, flags=table_flags, outer_size_height=-footer_height):
+                    imgui.table_setup_column("Apply", init_width_or_weight=0.6)
+                    imgui.table_setup_column("Name", init_width_or_weight=5.0)
+                    imgui.table_setup_column(left_label, init_width_or_weight=3.0)
+                    imgui.table_setup_column(right_label, init_width_or_weight=3.0)
+                    imgui.table_headers_row()
+                    if self.virtualize_table:
+                        clipper = imgui.ListClipper()
+                        clipper.begin(len(rows))
+                        while clipper.step():
+                            for index in range(clipper.display_start, clipper.display_end):
+                                self.draw_compare_row(diff, rows[index])
+                        clipper.end()
+                    else:
+                        for key in rows:
+                            self.draw_compare_row(diff, key)
+                    imgui.end_table()
+
+                if imgui.button("Tick Shown"):
+                    self.compare_selected.update(rows)
+                imgui.same_line()
+                if imgui.button("Untick All"):
+                    self.compare_selected.clear()
+                imgui.same_line()
+                if imgui.button("Apply Ticked To Current Flags"):
+                    self.apply_compare_selection()
+                imgui.same_line()
+
+            if imgui.button("Close"):
+                imgui.close_current_popup()
+            imgui.end_popup()
+
+    def draw_compare_row(self, diff: FlagDiff, key: str):
+        imgui.table_next_row()
+        imgui.table_next_column()
+        imgui.push_id(key)
+        toggled, ticked = imgui.checkbox("##tick", key in self.compare_selected)
+        imgui.pop_id()
+        if toggled:
+            if ticked:
+                self.compare_selected.add(key)
+            else:
+                self.compare_selected.discard(key)
+
+        kind = diff.kind(key)
+        imgui.table_next_column()
+        imgui.text_colored(f"{KIND_MARKS[kind]} {key}", *COMPARE_COLORS[kind])
+        imgui.table_next_column()
+        imgui.text(json.dumps(diff.left[key]) if key in diff.left else "")
+        imgui.table_next_column()
+        imgui.text(json.dumps(diff.right[key]) if key in diff.right else "")
+
     def draw_error_popup(self):
         if self.show_error_popup:
             imgui.open_popup(self.error_popup_title)
@@ -0,0 +1,232 @@
+import json
+from bisect import bisect_left
+from json.decoder import WHITESPACE
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+PATCH_MAX_FRACTION = 0.5
+PATCH_MIN_CHANGES = 16
+SHIFT_LIMIT = 512
+SCALAR_TYPES = (str, int, float, bool, type(None))
+
+Span = Tuple[int, int, int, int]
+
+_MISSING = object()
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def dumps_pretty(obj: Any) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2).encode("utf-8")
+
+
+def dumps_compact(obj: Any, sort_keys: bool = False) -> bytes:
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+        except TypeError:
+            pass
+    return json.dumps(obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def dumps_value(value: Any, indent: str = "  ") -> str:
+    if isinstance(value, SCALAR_TYPES):
+        return json.dumps(value)
+    return json.dumps(value, indent=2).replace("\n", "\n" + indent)
+
+
+def _skip(text: str, index: int) -> int:
+    return WHITESPACE.match(text, index).end()
+
+
+def scan_object(text: str) -> Iterator[Tuple[str, Any, Span]]:
+    decoder = json.JSONDecoder()
+    index = _skip(text, 0)
+    if index == len(text):
+        return
+    if text[index] != "{":
+        raise TypeError("Imported JSON is not a dictionary.")
+
+    index = _skip(text, index + 1)
+    if text[index:index + 1] == "}":
+        index += 1
+    else:
+        while True:
+            if text[index:index + 1] != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes", text, index)
+            key_start = index
+            key, key_end = decoder.raw_decode(text, index)
+            index = _skip(text, key_end)
+            if text[index:index + 1] != ":":
+                raise json.JSONDecodeError("Expecting ':' delimiter", text, index)
+            value_start = _skip(text, index + 1)
+            value, index = decoder.raw_decode(text, value_start)
+            yield key, value, (key_start, key_end, value_start, index)
+
+            index = _skip(text, index)
+            delimiter = text[index:index + 1]
+            if delimiter == "}":
+                index += 1
+                break
+            if delimiter != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", text, index)
+            index = _skip(text, index + 1)
+
+    if _skip(text, index) != len(text):
+        raise json.JSONDecodeError("Extra data", text, index)
+
+
+def _same(a: Any, b: Any) -> bool:
+    return a is b or (type(a) is type(b) and a == b)
+
+
+class JsonLayout:
+    def __init__(self, text: str):
+        self.text = text
+        self.keys: List[Optional[str]] = []
+        self.index: Dict[str, int] = {}
+        self.spans: List[Span] = []
+        self.values: Dict[str, Any] = {}
+        self.dead_count = 0
+        self.shift_entries: List[int] = []
+        self.shift_prefix: List[int] = [0]
+        for key, value, span in scan_object(text):
+            if key in self.values:
+                raise ValueError(f"Duplicate key '{key}'.")
+            self.index[key] = len(self.keys)
+            self.keys.append(key)
+            self.spans.append(span)
+            self.values[key] = value
+        if not self.keys:
+            raise ValueError("Nothing to patch in an empty object.")
+
+    def span(self, entry: int) -> Span:
+        offset = self.shift_prefix[bisect_left(self.shift_entries, entry)]
+        key_start, key_end, value_start, value_end = self.spans[entry]
+        return key_start + offset, key_end + offset, value_start + offset, value_end + offset
+
+    def _set_shifts(self, shifts: Dict[int, int]):
+        self.shift_entries = sorted(shifts)
+        self.shift_prefix = [0]
+        for entry in self.shift_entries:
+            self.shift_prefix.append(self.shift_prefix[-1] + shifts[entry])
+
+    def _compact(self):
+        live = [entry for entry, key in enumerate(self.keys) if key is not None]
+        self.spans = [self.span(entry) for entry in live]
+        self.keys = [self.keys[entry] for entry in live]
+        self.index = {key: entry for entry, key in enumerate(self.keys)}
+        self.dead_count = 0
+        self._set_shifts({})
+
+    def _live_neighbor(self, entry: int, step: int, removing: Dict[int, bool]) -> int:
+        entry += step
+        while 0 <= entry < len(self.keys) and (self.keys[entry] is None or removing.get(entry)):
+            entry += step
+        return entry
+
+    def _formatting(self) -> Tuple[str, str]:
+        first = self._live_neighbor(-1, 1, {})
+        second = self._live_neighbor(first, 1, {})
+        key_start, key_end, value_start, value_end = self.span(first)
+        if second < len(self.keys):
+            separator = self.text[value_end:self.span(second)[0]]
+        else:
+            separator = "," + self.text[self.text.index("{") + 1:key_start]
+        return separator, self.text[key_end:value_start]
+
+    def patch(self, flags: Dict[str, Any]) -> Optional[str]:
+        values = self.values
+        candidates = [key for key, value in flags.items() if values.get(key, _MISSING) is not value]
+        changed = [key for key in candidates if not _same(values.get(key, _MISSING), flags[key])]
+        added = [key for key in changed if key not in values]
+        removed = [key for key in values if key not in flags] if len(values) + len(added) != len(flags) else []
+        limit = max(PATCH_MIN_CHANGES, PATCH_MAX_FRACTION * max(len(values), len(flags)))
+        if len(changed) + len(removed) > limit or not flags:
+            return None
+        if not changed and not removed:
+            self.values = flags
+            return self.text
+
+        text = self.text
+        separator, colon = self._formatting()
+        removing = {self.index[key]: True for key in removed}
+        edits = sorted([self.index[key] for key in changed if key in values] + list(removing))
+        tail_start = self.span(self._live_neighbor(len(self.keys), -1, {}))[3]
+
+        pieces = []
+        previous_end = 0
+        shifts = dict(zip(self.shift_entries, (b - a for a, b in zip(self.shift_prefix, self.shift_prefix[1:]))))
+        grown: Dict[int, int] = {}
+        for entry in edits:
+            key_start, key_end, value_start, value_end = self.span(entry)
+            if entry in removing:
+                before = self._live_neighbor(entry, -1, removing)
+                if before >= 0:
+                    cut_start, cut_end = self.span(before)[3], value_end
+                else:
+                    after = self._live_neighbor(entry, 1, removing)
+                    if after >= len(self.keys):
+                        return None
+                    cut_start, cut_end = key_start, self.span(after)[0]
+                cut_start = max(cut_start, previous_end)
+                pieces.append(text[previous_end:cut_start])
+                previous_end = max(cut_end, previous_end)
+                delta = cut_start - previous_end
+            else:
+                encoded = dumps_value(flags[self.keys[entry]])
+                pieces.append(text[previous_end:value_start])
+                pieces.append(encoded)
+                previous_end = value_end
+                delta = len(encoded) - (value_end - value_start)
+                grown[entry] = delta
+            if delta:
+                shifts[entry] = shifts.get(entry, 0) + delta
+        pieces.append(text[previous_end:tail_start])
+
+        for entry, delta in grown.items():
+            key_start, key_end, value_start, value_end = self.spans[entry]
+            self.spans[entry] = (key_start, key_end, value_start, value_end + delta)
+        for entry in removing:
+            del self.index[self.keys[entry]]
+            self.keys[entry] = None
+        self.dead_count += len(removing)
+        self._set_shifts(shifts)
+
+        if added:
+            offset = sum(map(len, pieces))
+            total_shift = self.shift_prefix[-1]
+            for key in added:
+                encoded_key = dumps_value(key)
+                entry_text = separator + encoded_key + colon + dumps_value(flags[key])
+                key_start = offset + len(separator) - total_shift
+                key_end = key_start + len(encoded_key)
+                self.index[key] = len(self.keys)
+                self.keys.append(key)
+                self.spans.append((key_start, key_end, key_end + len(colon), key_start + len(entry_text) - len(separator)))
+                pieces.append(entry_text)
+                offset += len(entry_text)
+        pieces.append(text[tail_start:])
+
+        self.text = "".join(pieces)
+        self.values = flags
+        if len(self.shift_entries) > SHIFT_LIMIT or self.dead_count > len(self.index):
+            self._compact()
+        return self.text
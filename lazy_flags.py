@@ -0,0 +1,100 @@
+import re
+from array import array
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional
+
+import json_codec
+
+_WS = rb"[ \t\n\r]*"
+_STRING = rb'"[^"\\\x00-\x1f]*(?:\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})[^"\\\x00-\x1f]*)*"'
+_LITERAL = rb"-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?|true|false|null"
+_OPEN = re.compile(_WS + rb"\{")
+_ENTRY = re.compile(_WS + rb"(" + _STRING + rb")" + _WS + rb":" + _WS + rb"(" + _STRING + rb"|" + _LITERAL + rb")" + _WS + rb"([,}])")
+
+
+class LazyFlags(MutableMapping):
+    def __init__(self, data: bytes, entries: Dict[str, int], starts: array, ends: array,
+                 loaded: Optional[Dict[str, Any]] = None, shared: bool = False):
+        self.data = data
+        self.entries = entries
+        self.starts = starts
+        self.ends = ends
+        self.loaded: Dict[str, Any] = loaded if loaded is not None else {}
+        self.shared = shared
+
+    def _own_entries(self):
+        if self.shared:
+            self.entries = dict(self.entries)
+            self.shared = False
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return self.loaded[key]
+        except KeyError:
+            pass
+        entry = self.entries[key]
+        value = self.loaded[key] = json_codec.loads(self.data[self.starts[entry]:self.ends[entry]])
+        return value
+
+    def __setitem__(self, key: str, value: Any):
+        if key not in self.entries:
+            self._own_entries()
+            self.entries[key] = -1
+        self.loaded[key] = value
+
+    def __delitem__(self, key: str):
+        if key not in self.entries:
+            raise KeyError(key)
+        self._own_entries()
+        del self.entries[key]
+        self.loaded.pop(key, None)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.entries
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def loaded_count(self) -> int:
+        return len(self.loaded)
+
+    def copy(self) -> "LazyFlags":
+        self.shared = True
+        return LazyFlags(self.data, self.entries, self.starts, self.ends, dict(self.loaded), shared=True)
+
+
+def same_source(a: Any, b: Any, key: str) -> bool:
+    return (isinstance(a, LazyFlags) and isinstance(b, LazyFlags) and a.data is b.data
+            and key not in a.loaded and key not in b.loaded and a.entries[key] == b.entries[key] != -1)
+
+
+def scan_flags(data: bytes) -> Optional[LazyFlags]:
+    opening = _OPEN.match(data)
+    if opening is None:
+        return None
+
+    position = opening.end()
+    raw_keys: List[bytes] = []
+    starts, ends = array("Q"), array("Q")
+    closed = False
+    for match in _ENTRY.finditer(data, position):
+        if closed or match.start() != position:
+            return None
+        raw_keys.append(match.group(1))
+        starts.append(match.start(2))
+        ends.append(match.end(2))
+        closed = match.group(3) == b"}"
+        position = match.end()
+
+    if not closed or data[position:].strip(b" \t\n\r"):
+        return None
+
+    keys = json_codec.loads(b"[" + b",".join(raw_keys) + b"]")
+    entries = dict(zip(keys, range(len(keys))))
+    if len(entries) != len(keys):
+        return None
+    return LazyFlags(data, entries, starts, ends)
@@ -0,0 +1,438 @@
+import asyncio
+import hmac
+import os
+import secrets
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import json_codec
+from bulk_ops import merge_batch, replace_batch
+from flag_model import FlagModel, convert_value, validate_value
+from flag_query import QueryEngine, QueryError
+from save_writer import write_atomic
+from type_engine import coerce_flag
+
+API_HOST = "127.0.0.1"
+API_INFO_NAME = os.path.join("FastFlagEditor", "api.json")
+API_LABEL = "API"
+MAX_BODY_SIZE = 32 * 1024 * 1024
+MAX_HEADER_LINES = 100
+IDLE_TIMEOUT = 60.0
+SAVE_DELAY = 1.0
+WAIT_SLICE = 0.5
+
+STATUS_TEXT = {
+    200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 503: "Service Unavailable",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def get_api_info_path() -> Optional[str]:
+    local_app_data = os.environ.get("LOCALAPPDATA")
+    if not local_app_data:
+        return None
+    return os.path.join(local_app_data, API_INFO_NAME)
+
+
+def read_api_info() -> Optional[Dict[str, Any]]:
+    path = get_api_info_path()
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            info = json_codec.loads(f.read())
+    except (OSError, ValueError):
+        return None
+    return info if isinstance(info, dict) else None
+
+
+def parse_entries(data: Any, types: Any = None) -> Dict[str, Tuple[Any, str]]:
+    if not isinstance(data, dict):
+        raise ValueError("'set' must be an object of flag names to values.")
+    if types is None:
+        types = {}
+    elif not isinstance(types, dict):
+        raise ValueError("'types' must be an object of flag names to types.")
+
+    entries = {}
+    for key, value in data.items():
+        flag_type = types.get(key)
+        if flag_type is None:
+            entries[key] = coerce_flag(key, value)
+            continue
+        if flag_type not in ("bool", "int", "string"):
+            raise ValueError(f"Unknown type '{flag_type}' for {key}.")
+        text = str(value).lower() if isinstance(value, bool) else str(value)
+        if not validate_value(flag_type, text):
+            raise ValueError(f"Value '{text}' is not a valid {flag_type} for {key}.")
+        entries[key] = convert_value(flag_type, text), flag_type
+    return entries
+
+
+class ApiCall:
+    def __init__(self, kind: str, payload: Any, loop: asyncio.AbstractEventLoop):
+        self.kind = kind
+        self.payload = payload
+        self.loop = loop
+        self.future: asyncio.Future = loop.create_future()
+
+    def resolve(self, result: Any):
+        self._settle(result, None)
+
+    def fail(self, error: ApiError):
+        self._settle(None, error)
+
+    def _settle(self, result: Any, error: Optional[ApiError]):
+        def settle():
+            if self.future.done():
+                return
+            if error is not None:
+                self.future.set_exception(error)
+            else:
+                self.future.set_result(result)
+        try:
+            self.loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            pass
+
+
+class ApiSnapshot:
+    def __init__(self, revision: int, enabled: bool, flags: Dict[str, Any]):
+        self.revision = revision
+        self.enabled = enabled
+        self.flags = flags
+        self._keys: Optional[List[str]] = None
+
+    @property
+    def keys(self) -> List[str]:
+        if self._keys is None:
+            self._keys = sorted(self.flags)
+        return self._keys
+
+
+class ApiServer:
+    def __init__(self, model: FlagModel, port: int = 0, token: Optional[str] = None, host: str = API_HOST,
+                 on_call: Optional[Callable[[], None]] = None):
+        self.model = model
+        self.host = host
+        self.port = port
+        self.token = token
+        self.on_call = on_call
+        self.snapshot: Optional[ApiSnapshot] = None
+        self.requests_served = 0
+        self.info_path: Optional[str] = None
+        self._pending: List[ApiCall] = []
+        self._notified = False
+        self._condition = threading.Condition()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._started = threading.Event()
+        self._start_error: Optional[BaseException] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="LocalApi", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._start_error is not None:
+            raise self._start_error
+
+    def stop(self):
+        if self._loop is not None and self._thread is not None and self._thread.is_alive():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self.poll()
+        self.remove_info()
+
+    def write_info(self) -> Optional[str]:
+        path = get_api_info_path()
+        if not path:
+            return None
+        info = {"url": self.url, "port": self.port, "token": self.token, "pid": os.getpid()}
+        write_atomic(path, json_codec.dumps_pretty(info))
+        self.info_path = path
+        return path
+
+    def remove_info(self):
+        if self.info_path is None:
+            return
+        try:
+            os.unlink(self.info_path)
+        except OSError:
+            pass
+        self.info_path = None
+
+    def poll(self) -> List[ApiCall]:
+        with self._condition:
+            calls, self._pending = self._pending, []
+            self._notified = False
+        return calls
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        with self._condition:
+            if not self._pending:
+                self._condition.wait(timeout)
+            return bool(self._pending)
+
+    def publish(self) -> ApiSnapshot:
+        model = self.model
+        snapshot = self.snapshot
+        if snapshot is None or snapshot.revision != model.revision or snapshot.enabled != model.flags_enabled:
+            snapshot = self.snapshot = ApiSnapshot(model.revision, model.flags_enabled, model.flags.copy())
+        return snapshot
+
+    def process(self, engine: QueryEngine) -> Tuple[List[str], List[str]]:
+        calls = self.poll()
+        model = self.model
+        added_keys: List[str] = []
+        removed_keys: List[str] = []
+        reads = []
+        mutations = []
+        for call in calls:
+            (reads if call.kind in ("snapshot", "query") else mutations).append(call)
+
+        if mutations:
+            with model.transaction(API_LABEL):
+                for call in mutations:
+                    try:
+                        added, removed = self._apply(call)
+                    except (ValueError, TypeError) as e:
+                        call.fail(ApiError(400, str(e)))
+                        continue
+                    added_keys.extend(added)
+                    removed_keys.extend(removed)
+
+        snapshot = None
+        for call in reads:
+            if call.kind == "query":
+                try:
+                    call.resolve(engine.search(call.payload))
+                except QueryError as e:
+                    call.fail(ApiError(400, str(e)))
+            else:
+                snapshot = snapshot or self.publish()
+                call.resolve(snapshot)
+        return added_keys, removed_keys
+
+    def _apply(self, call: ApiCall) -> Tuple[List[str], List[str]]:
+        model = self.model
+        entries, removals, overwrite, enabled = call.payload
+        batch = replace_batch(model, entries) if overwrite else merge_batch(model, entries, removals)
+        added, removed = model.apply_batch(batch.updates, batch.removals) if batch else ([], [])
+        if enabled is not None:
+            model.flags_enabled = enabled
+        call.resolve({
+            "revision": model.revision, "added": len(added), "changed": len(batch.updates) - len(added),
+            "removed": len(removed), "enabled": model.flags_enabled,
+        })
+        return added, removed
+
+    def _submit(self, kind: str, payload: Any) -> asyncio.Future:
+        call = ApiCall(kind, payload, self._loop)
+        with self._condition:
+            self._pending.append(call)
+            notify = not self._notified
+            self._notified = True
+            self._condition.notify()
+        if notify and self.on_call is not None:
+            self.on_call()
+        return call.future
+
+    async def _snapshot(self) -> ApiSnapshot:
+        snapshot = self.snapshot
+        model = self.model
+        if snapshot is not None and snapshot.revision == model.revision and snapshot.enabled == model.flags_enabled:
+            return snapshot
+        return await self._submit("snapshot", None)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            server = loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+        except OSError as e:
+            self._start_error = e
+            self._started.set()
+            loop.close()
+            return
+        self.port = server.sockets[0].getsockname()[1]
+        self._loop = loop
+        self._started.set()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            for writer in list(self._writers):
+                writer.close()
+            loop.run_until_complete(server.wait_closed())
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.close()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._writers.add(writer)
+        try:
+            while True:
+                keep_alive = False
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), IDLE_TIMEOUT)
+                    if request is None:
+                        break
+                    method, target, keep_alive, headers, body = request
+                    status, result = 200, await self._dispatch(method, target, headers, body)
+                except ApiError as e:
+                    status, result = e.status, {"error": e.message}
+
+                payload = json_codec.dumps_compact(result)
+                head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: application/json\r\n"
+                        f"Content-Length: {len(payload)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode("latin-1") + payload)
+                await writer.drain()
+                self.requests_served += 1
+                if not keep_alive:
+                    break
+        except (asyncio.CancelledError, asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, bool, Dict[str, str], bytes]]:
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/1."):
+            raise ApiError(400, "Malformed request line.")
+        method, target, version = parts
+
+        headers = {}
+        for _ in range(MAX_HEADER_LINES):
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        else:
+            raise ApiError(400, "Too many headers.")
+
+        connection = headers.get("connection", "").lower()
+        keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise ApiError(400, "Bad Content-Length.")
+        if length > MAX_BODY_SIZE:
+            raise ApiError(413, f"Request bodies are limited to {MAX_BODY_SIZE} bytes.")
+        body = await reader.readexactly(length) if length > 0 else b""
+        return method, target, keep_alive, headers, body
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes) -> Any:
+        if self.token is not None:
+            supplied = headers.get("authorization", "").encode("latin-1")
+            if not hmac.compare_digest(supplied, f"Bearer {self.token}".encode("latin-1")):
+                raise ApiError(401, "Missing or wrong API token.")
+
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+        reading = method == "GET"
+
+        if path == "/status":
+            _expect(reading, method)
+            snapshot = await self._snapshot()
+            return {"revision": snapshot.revision, "enabled": snapshot.enabled, "count": len(snapshot.flags)}
+
+        if path == "/flags":
+            _expect(reading, method)
+            snapshot = await self._snapshot()
+            if "keys" not in query:
+                return snapshot.flags if isinstance(snapshot.flags, dict) else dict(snapshot.flags)
+            keys = [key for value in query["keys"] for key in value.split(",") if key]
+            return {key: snapshot.flags[key] for key in keys if key in snapshot.flags}
+
+        if path.startswith("/flags/"):
+            _expect(reading, method)
+            key = unquote(path[len("/flags/"):])
+            snapshot = await self._snapshot()
+            if key not in snapshot.flags:
+                raise ApiError(404, f"No flag named '{key}'.")
+            return {"key": key, "value": snapshot.flags[key]}
+
+        if path == "/keys":
+            _expect(reading, method)
+            search = query.get("q", [""])[0].strip()
+            keys = await self._submit("query", search) if search else (await self._snapshot()).keys
+            return {"count": len(keys), "keys": keys}
+
+        if path in ("/batch", "/import"):
+            _expect(method == "POST", method)
+            try:
+                data = json_codec.loads(body or b"{}")
+            except ValueError as e:
+                raise ApiError(400, f"Invalid JSON: {e}")
+            if not isinstance(data, dict):
+                raise ApiError(400, "The request body must be a JSON object.")
+            try:
+                payload = self._mutation(path, data)
+            except (ValueError, TypeError) as e:
+                raise ApiError(400, str(e))
+            return await self._submit("mutation", payload)
+
+        raise ApiError(404, f"Unknown endpoint {path}.")
+
+    def _mutation(self, path: str, data: Dict[str, Any]) -> Tuple[Dict[str, Tuple[Any, str]], List[str], bool, Optional[bool]]:
+        enabled = data.get("enabled")
+        if enabled is not None and not isinstance(enabled, bool):
+            raise ValueError("'enabled' must be true or false.")
+        if path == "/import":
+            return parse_entries(data.get("flags", {})), [], bool(data.get("overwrite", False)), enabled
+
+        removals = data.get("remove", [])
+        if not isinstance(removals, list) or not all(isinstance(key, str) for key in removals):
+            raise ValueError("'remove' must be a list of flag names.")
+        return parse_entries(data.get("set", {}), data.get("types")), removals, False, enabled
+
+
+def _expect(allowed: bool, method: str):
+    if not allowed:
+        raise ApiError(405, f"{method} is not allowed here.")
+
+
+def new_token() -> str:
+    return secrets.token_urlsafe(24)
+
+
+def serve_forever(server: ApiServer, engine: QueryEngine, save: Callable[[], None], save_delay: float = SAVE_DELAY,
+                  stop: Optional[threading.Event] = None):
+    model = server.model
+    save_due: Optional[float] = None
+    try:
+        while stop is None or not stop.is_set():
+            timeout = WAIT_SLICE if save_due is None else min(WAIT_SLICE, max(0.0, save_due - time.monotonic()))
+            server.wait(timeout)
+            state = model.revision, model.flags_enabled
+            server.process(engine)
+            if (model.revision, model.flags_enabled) != state and save_due is None:
+                save_due = time.monotonic() + save_delay
+            if save_due is not None and time.monotonic() >= save_due:
+                save()
+                save_due = None
+    finally:
+        if save_due is not None:
+            save()
@@ -1,14 +1,39 @@
 import sys
 import os
 import ctypes
-import pygame
-import imgui
-from imgui.integrations.pygame import PygameRenderer
-from functions import FastFlagEditorApp
-from PIL import Image
-import OpenGL.GL as gl 
+import argparse
+import cli
+
+FRAME_CAP = 60
+IDLE_SETTLE_FRAMES = 3
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Roblox Fast Flag Editor")
+    parser.add_argument("--fps-cap", type=int, default=FRAME_CAP, help="maximum frames per second, 0 for uncapped")
+    parser.add_argument("--no-idle", action="store_true", help="keep rendering while the window is idle")
+    parser.add_argument("--show-fps", action="store_true", help="show the measured frame rate")
+    parser.add_argument("--catalog", metavar="PATH", help="known-flags catalog used for name autocomplete")
+    parser.add_argument("--timings", action="store_true", help="show per-frame timings of the hot paths")
+    parser.add_argument("--undo-limit", type=int, default=64, metavar="MIB", help="memory budget for the undo history")
+    parser.add_argument("--lazy-threshold", type=int, default=-1, metavar="MIB",
+                        help="parse values on demand for settings files at least this large, -1 (default) to always parse eagerly")
+    parser.add_argument("--api-port", type=int, metavar="PORT",
+                        help="serve the local API on 127.0.0.1:PORT while the editor is open, 0 picks a free port")
+    parser.add_argument("--timings-dump", metavar="PATH", help="write the collected timing samples to PATH on exit")
+    return parser.parse_args()
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] in cli.COMMANDS:
+        sys.exit(cli.main(sys.argv[1:]))
+
+    args = parse_args()
+
+    import pygame
+    import imgui
+    from imgui.integrations.pygame import PygameRenderer
+    from functions import FastFlagEditorApp
+    from PIL import Image
+    import OpenGL.GL as gl 
 
     myappid = 'roblox.fast.flag.editor.1.0.0'
     try:
@@ -48,11 +73,32 @@ def main():
 
     #     impl.refresh_font_texture()
 
-    app = FastFlagEditorApp()
+    app = FastFlagEditorApp(lazy_threshold=args.lazy_threshold * 1024 * 1024 if args.lazy_threshold >= 0 else None)
+    app.show_frame_rate = args.show_fps
+    app.model.journal.memory_limit = args.undo_limit * 1024 * 1024
+    if args.catalog:
+        app.load_catalog(args.catalog)
+    if args.api_port is not None:
+        app.start_api(args.api_port)
+    app.profiler.enabled = args.timings or bool(args.timings_dump)
+    app.show_profiler = args.timings
+
+    clock = pygame.time.Clock()
+    settle_frames = IDLE_SETTLE_FRAMES
 
     running = True
     while running:
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if events:
+            settle_frames = IDLE_SETTLE_FRAMES
+        elif not args.no_idle and settle_frames <= 0:
+            timeout = app.ticks_until_next_timer()
+            event = pygame.event.wait() if timeout is None else pygame.event.wait(timeout)
+            if event.type != pygame.NOEVENT:
+                events = [event] + pygame.event.get()
+                settle_frames = IDLE_SETTLE_FRAMES
+
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             if event.type == pygame.VIDEORESIZE:
@@ -64,20 +110,34 @@ def main():
         if not running:
             break
 
-        app.update()
+        profiler = app.profiler
+        profiler.begin_frame()
+
+        with profiler.section("update"):
+            app.update()
 
         impl.process_inputs()
         imgui.new_frame()
 
-        app.draw_ui()
+        with profiler.section("draw_ui"):
+            app.draw_ui()
+
+        with profiler.section("render"):
+            gl.glClearColor(0.2, 0.2, 0.2, 1.0)
+            gl.glClear(gl.GL_COLOR_BUFFER_BIT)
 
-        gl.glClearColor(0.2, 0.2, 0.2, 1.0)
-        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+            imgui.render()
+            impl.render(imgui.get_draw_data())
+            pygame.display.flip()
 
-        imgui.render()
-        impl.render(imgui.get_draw_data())
-        pygame.display.flip()
+        profiler.end_frame()
+        settle_frames -= 1
+        clock.tick(args.fps_cap)
+        app.frame_rate = clock.get_fps()
 
+    app.shutdown()
+    if args.timings_dump:
+        app.profiler.dump(args.timings_dump)
     impl.shutdown()
     pygame.quit()
     sys.exit()
@@ -0,0 +1,156 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import json_codec
+from flag_model import FlagModel
+
+PROFILE_DB_NAME = os.path.join("FastFlagEditor", "profiles.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS profile_flags (
+    profile_id INTEGER NOT NULL REFERENCES profiles(id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    type TEXT NOT NULL,
+    PRIMARY KEY (profile_id, key)
+) WITHOUT ROWID;
+"""
+
+ProfileEntries = Dict[str, Tuple[Any, str]]
+
+
+def get_profile_db_path() -> Optional[str]:
+    local_app_data = os.environ.get("LOCALAPPDATA")
+    if not local_app_data:
+        return None
+    return os.path.join(local_app_data, PROFILE_DB_NAME)
+
+
+def _encode(value: Any) -> str:
+    return json_codec.dumps_compact(value).decode("utf-8")
+
+
+class Profile:
+    def __init__(self, profile_id: int, name: str, updated: float, count: int):
+        self.id = profile_id
+        self.name = name
+        self.updated = updated
+        self.count = count
+
+    def describe(self) -> str:
+        updated = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(self.updated))
+        return f"{self.name:<24} {updated}  ({self.count} flags)"
+
+
+class ProfileStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def profiles(self) -> List[Profile]:
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT p.id, p.name, p.updated, COUNT(f.key) FROM profiles p "
+                "LEFT JOIN profile_flags f ON f.profile_id = p.id GROUP BY p.id ORDER BY p.name COLLATE NOCASE"
+            ).fetchall()
+        return [Profile(*row) for row in rows]
+
+    def find(self, name: str) -> Profile:
+        with self._lock:
+            row = self._connect().execute(
+                "SELECT p.id, p.name, p.updated, (SELECT COUNT(*) FROM profile_flags f WHERE f.profile_id = p.id) "
+                "FROM profiles p WHERE p.name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            raise ValueError(f"No profile named '{name}'.")
+        return Profile(*row)
+
+    def entries(self, name: str) -> ProfileEntries:
+        profile = self.find(name)
+        with self._lock:
+            rows = self._connect().execute(
+                "SELECT key, value, type FROM profile_flags WHERE profile_id = ?", (profile.id,)
+            ).fetchall()
+        return {key: (json_codec.loads(value), flag_type) for key, value, flag_type in rows}
+
+    def load(self, name: str) -> Dict[str, Any]:
+        return {key: value for key, (value, _) in self.entries(name).items()}
+
+    def save(self, name: str, entries: ProfileEntries) -> Tuple[Profile, int]:
+        name = name.strip()
+        if not name:
+            raise ValueError("Profile name cannot be empty.")
+        encoded = {key: (_encode(value), flag_type) for key, (value, flag_type) in entries.items()}
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                row = conn.execute("SELECT id FROM profiles WHERE name = ?", (name,)).fetchone()
+                if row is None:
+                    profile_id = conn.execute(
+                        "INSERT INTO profiles (name, created, updated) VALUES (?, ?, ?)", (name, now, now)
+                    ).lastrowid
+                    stored = {}
+                else:
+                    profile_id = row[0]
+                    stored = {key: (value, flag_type) for key, value, flag_type in conn.execute(
+                        "SELECT key, value, type FROM profile_flags WHERE profile_id = ?", (profile_id,))}
+
+                removals = [(profile_id, key) for key in stored if key not in encoded]
+                changes = [(profile_id, key, value, flag_type) for key, (value, flag_type) in encoded.items()
+                           if stored.get(key) != (value, flag_type)]
+                conn.executemany("DELETE FROM profile_flags WHERE profile_id = ? AND key = ?", removals)
+                conn.executemany("INSERT OR REPLACE INTO profile_flags (profile_id, key, value, type) VALUES (?, ?, ?, ?)",
+                                 changes)
+                conn.execute("UPDATE profiles SET updated = ? WHERE id = ?", (now, profile_id))
+        return Profile(profile_id, name, now, len(encoded)), len(removals) + len(changes)
+
+    def save_model(self, name: str, model: FlagModel) -> Tuple[Profile, int]:
+        return self.save(name, {key: (model.flags[key], model.flag_type(key)) for key in model.flags})
+
+    def rename(self, name: str, new_name: str):
+        new_name = new_name.strip()
+        if not new_name:
+            raise ValueError("Profile name cannot be empty.")
+        profile = self.find(name)
+        with self._lock:
+            try:
+                with self._connect() as conn:
+                    conn.execute("UPDATE profiles SET name = ? WHERE id = ?", (new_name, profile.id))
+            except sqlite3.IntegrityError:
+                raise ValueError(f"A profile named '{new_name}' already exists.")
+
+    def delete(self, name: str):
+        profile = self.find(name)
+        with self._lock:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM profiles WHERE id = ?", (profile.id,))
+
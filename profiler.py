@@ -0,0 +1,77 @@
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+SAMPLE_CAPACITY = 600
+FRAME_SECTION = "frame"
+
+
+def percentile(sorted_samples: List[float], fraction: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(round(fraction * (len(sorted_samples) - 1))))
+    return sorted_samples[index]
+
+
+class Profiler:
+    def __init__(self, capacity: int = SAMPLE_CAPACITY, enabled: bool = False):
+        self.capacity = capacity
+        self.enabled = enabled
+        self.samples: Dict[str, Deque[float]] = {}
+        self.frame_totals: Dict[str, float] = {}
+        self.frame_start: Optional[float] = None
+
+    @contextmanager
+    def section(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        if self.enabled:
+            self.frame_totals[name] = self.frame_totals.get(name, 0.0) + seconds
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        self.add(FRAME_SECTION, time.perf_counter() - self.frame_start)
+        self.frame_start = None
+
+        for name, seconds in self.frame_totals.items():
+            samples = self.samples.get(name)
+            if samples is None:
+                samples = self.samples[name] = deque(maxlen=self.capacity)
+            samples.append(seconds)
+        self.frame_totals = {}
+
+    def stats(self, name: str) -> Tuple[float, float, float, int]:
+        ordered = sorted(self.samples.get(name, ()))
+        if not ordered:
+            return 0.0, 0.0, 0.0, 0
+        return percentile(ordered, 0.5), percentile(ordered, 0.95), ordered[-1], len(ordered)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for name in sorted(self.samples):
+            p50, p95, peak, count = self.stats(name)
+            result[name] = {"p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "max_ms": peak * 1000, "frames": count}
+        return result
+
+    def dump(self, path: str):
+        data = {
+            "summary": self.summary(),
+            "samples_ms": {name: [s * 1000 for s in samples] for name, samples in self.samples.items()},
+        }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
@@ -0,0 +1,92 @@
+from itertools import compress
+from typing import Any, Dict, Iterable, List, Optional
+
+from type_engine import TYPE_CODES, TYPE_NAMES
+
+STRING_CODE = TYPE_CODES["string"]
+UNKNOWN_CODE = 0x7F
+SELECTED = 0x80
+DISPLAY_CACHE_SIZE = 4096
+
+TYPE_TABLE = bytes(code & UNKNOWN_CODE for code in range(256))
+SELECTED_TABLE = bytes(code >> 7 for code in range(256))
+SELECT_TABLE = bytes(code | SELECTED for code in range(256))
+CLEAR_TABLE = bytes(code & ~SELECTED for code in range(256))
+
+
+class RowStore:
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.display: Dict[str, str] = {}
+        self.selected_count = 0
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def rebuild(self, flags: Dict[str, Any], flag_types: Optional[Dict[str, str]]):
+        if flag_types is None:
+            self.codes = dict.fromkeys(flags, UNKNOWN_CODE)
+        else:
+            self.codes = {name: TYPE_CODES.get(flag_types[name], STRING_CODE) for name in flags}
+        self.display = {}
+        self.selected_count = 0
+
+    def type_column(self) -> bytes:
+        return bytes(self.codes.values()).translate(TYPE_TABLE)
+
+    def set(self, key: str, flag_type: str):
+        self.codes[key] = (self.codes.get(key, 0) & SELECTED) | TYPE_CODES.get(flag_type, STRING_CODE)
+        self.display.pop(key, None)
+
+    def remove(self, key: str):
+        code = self.codes.pop(key, None)
+        if code is None:
+            return
+        if code & SELECTED:
+            self.selected_count -= 1
+        self.display.pop(key, None)
+
+    def type_of(self, key: str) -> Optional[str]:
+        code = self.codes[key] & UNKNOWN_CODE
+        return TYPE_NAMES[code] if code != UNKNOWN_CODE else None
+
+    def display_text(self, key: str, value: Any) -> str:
+        text = self.display.get(key)
+        if text is None:
+            if len(self.display) >= DISPLAY_CACHE_SIZE:
+                self.display.clear()
+            text = self.display[key] = str(value)
+        return text
+
+    def is_selected(self, key: str) -> bool:
+        return self.codes.get(key, 0) >= SELECTED
+
+    def select(self, key: str, selected: bool = True):
+        code = self.codes.get(key)
+        if code is None or (code >= SELECTED) == selected:
+            return
+        self.codes[key] = code ^ SELECTED
+        self.selected_count += 1 if selected else -1
+
+    def select_many(self, keys: Iterable[str]):
+        codes = self.codes
+        for key in keys:
+            code = codes.get(key)
+            if code is not None and code < SELECTED:
+                codes[key] = code | SELECTED
+                self.selected_count += 1
+
+    def _translate(self, table: bytes):
+        self.codes = dict(zip(self.codes, bytes(self.codes.values()).translate(table)))
+
+    def select_all(self):
+        self._translate(SELECT_TABLE)
+        self.selected_count = len(self.codes)
+
+    def clear_selection(self):
+        if self.selected_count:
+            self._translate(CLEAR_TABLE)
+            self.selected_count = 0
+
+    def selected_keys(self) -> List[str]:
+        return list(compress(self.codes, bytes(self.codes.values()).translate(SELECTED_TABLE)))
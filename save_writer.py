@@ -0,0 +1,190 @@
+import hashlib
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from json_codec import JsonLayout, dumps_pretty
+from settings_sync import FileSignature, file_signature
+
+REPLACE_ATTEMPTS = 3
+REPLACE_RETRY_DELAY = 0.05
+
+
+def serialize_flags(flags: Optional[Dict[str, Any]]) -> bytes:
+    if flags is None:
+        return b"{}"
+    return dumps_pretty(flags if isinstance(flags, dict) else dict(flags))
+
+
+def read_layout(path: str) -> Optional[JsonLayout]:
+    try:
+        with open(path, "rb") as f:
+            return JsonLayout(f.read().decode("utf-8"))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def write_atomic(path: str, data: bytes):
+    write_atomic_chunks(path, (data,))
+
+
+def write_atomic_chunks(path: str, chunks: Iterable[bytes]):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+
+    fd, temp_path = tempfile.mkstemp(prefix=".ClientAppSettings.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+
+        for attempt in range(REPLACE_ATTEMPTS):
+            try:
+                os.replace(temp_path, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_ATTEMPTS - 1:
+                    raise
+                time.sleep(REPLACE_RETRY_DELAY)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class SaveResult:
+    def __init__(self, path: str, written: bool, error: Optional[Exception] = None,
+                 flags: Optional[Dict[str, Any]] = None, signature: Optional[FileSignature] = None):
+        self.path = path
+        self.written = written
+        self.error = error
+        self.flags = flags
+        self.signature = signature
+        self.backup_error: Optional[Exception] = None
+        self.elapsed = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class SaveWriter:
+    def __init__(self, on_complete: Optional[Callable[[], None]] = None):
+        self.on_complete = on_complete
+        self.backup: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+        self.results: "queue.Queue[SaveResult]" = queue.Queue()
+        self._condition = threading.Condition()
+        self._pending: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._written: Dict[str, Tuple[bytes, Optional[FileSignature]]] = {}
+        self._layouts: Dict[str, Tuple[JsonLayout, Optional[FileSignature]]] = {}
+        self._busy = False
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="SaveWriter", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: str, flags: Optional[Dict[str, Any]]):
+        with self._condition:
+            self._pending[path] = flags
+            self._condition.notify()
+
+    def poll(self) -> Tuple[SaveResult, ...]:
+        results = []
+        while True:
+            try:
+                results.append(self.results.get_nowait())
+            except queue.Empty:
+                return tuple(results)
+
+    def written_signature(self, path: str) -> Optional[FileSignature]:
+        with self._condition:
+            written = self._written.get(path)
+        return written[1] if written is not None else None
+
+    def is_idle(self) -> bool:
+        with self._condition:
+            return not self._pending and not self._busy
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def stop(self, timeout: Optional[float] = None):
+        self.flush(timeout)
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopping)
+                if not self._pending:
+                    return
+                pending, self._pending = self._pending, {}
+                self._busy = True
+
+            results = []
+            for path, flags in pending.items():
+                start = time.perf_counter()
+                result = self._write(path, flags)
+                result.elapsed = time.perf_counter() - start
+                results.append(result)
+
+            with self._condition:
+                for result in results:
+                    self.results.put(result)
+                self._busy = False
+                self._condition.notify_all()
+
+            if self.on_complete:
+                self.on_complete()
+
+    def _write(self, path: str, flags: Optional[Dict[str, Any]]) -> SaveResult:
+        try:
+            signature = file_signature(path)
+            layout = self._patch_layout(path, flags, signature)
+            data = layout.text.encode("utf-8") if layout is not None else serialize_flags(flags)
+            digest = hashlib.blake2b(data, digest_size=16).digest()
+            if self._written.get(path) == (digest, signature):
+                if layout is not None:
+                    self._layouts[path] = (layout, signature)
+                return SaveResult(path, written=False, flags=flags, signature=signature)
+
+            write_atomic(path, data)
+            signature = file_signature(path)
+            with self._condition:
+                self._written[path] = (digest, signature)
+            if layout is not None:
+                self._layouts[path] = (layout, signature)
+            result = SaveResult(path, written=True, flags=flags, signature=signature)
+            if self.backup is not None and flags is not None:
+                try:
+                    self.backup(path, flags)
+                except (OSError, ValueError) as e:
+                    result.backup_error = e
+            return result
+        except Exception as e:
+            self._layouts.pop(path, None)
+            return SaveResult(path, written=False, error=e)
+
+    def _patch_layout(self, path: str, flags: Optional[Dict[str, Any]],
+                      signature: Optional[FileSignature]) -> Optional[JsonLayout]:
+        cached = self._layouts.pop(path, None)
+        if flags is None or signature is None:
+            return None
+        layout = cached[0] if cached is not None and cached[1] == signature else read_layout(path)
+        if layout is None or layout.patch(flags) is None:
+            return None
+        return layout
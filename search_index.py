@@ -0,0 +1,106 @@
+from array import array
+from typing import Dict, Iterable, List, Optional, Sized
+
+NGRAM_SIZE = 3
+
+
+class SearchIndex:
+    def __init__(self, keys: Iterable[str] = ()):
+        self.rebuild(keys)
+
+    def rebuild(self, keys: Iterable[str]):
+        self.ids: Dict[str, int] = {}
+        self.keys: List[Optional[str]] = []
+        self.lowered: List[Optional[str]] = []
+        self.postings: Dict[str, array] = {}
+        self.dead_count = 0
+        self.last_query = ""
+        self.last_results: Optional[List[int]] = None
+
+        for key in keys:
+            self._insert(key)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.ids
+
+    def add(self, key: str):
+        if key in self.ids:
+            return
+
+        key_id = self._insert(key)
+
+        if self.last_results is not None and self.last_query in self.lowered[key_id]:
+            self.last_results.append(key_id)
+
+    def remove(self, key: str):
+        key_id = self.ids.pop(key, None)
+        if key_id is None:
+            return
+
+        self.keys[key_id] = None
+        self.lowered[key_id] = None
+        self.dead_count += 1
+
+        if self.dead_count > len(self.ids):
+            self.rebuild([k for k in self.keys if k is not None])
+
+    def rename(self, old_key: str, new_key: str):
+        self.remove(old_key)
+        self.add(new_key)
+
+    def search(self, query: str) -> List[str]:
+        query_lower = query.lower()
+        lowered = self.lowered
+
+        candidates: Sized = range(len(lowered))
+        if len(query_lower) >= NGRAM_SIZE:
+            candidates = self._smallest_posting(query_lower)
+        if (self.last_results is not None and self.last_query and self.last_query in query_lower
+                and len(self.last_results) < len(candidates)):
+            candidates = self.last_results
+
+        results = [
+            i for i in candidates
+            if lowered[i] is not None and query_lower in lowered[i]
+        ]
+
+        self.last_query = query_lower
+        self.last_results = results
+
+        keys = self.keys
+        return [keys[i] for i in results]
+
+    def _smallest_posting(self, query_lower: str) -> array:
+        smallest: Optional[array] = None
+        for gram in self._grams(query_lower):
+            posting = self.postings.get(gram)
+            if posting is None:
+                return array("I")
+            if smallest is None or len(posting) < len(smallest):
+                smallest = posting
+        return smallest if smallest is not None else array("I")
+
+    def _insert(self, key: str) -> int:
+        key_id = len(self.keys)
+        key_lower = key.lower()
+
+        self.ids[key] = key_id
+        self.keys.append(key)
+        self.lowered.append(key_lower)
+
+        postings = self.postings
+        for gram in self._grams(key_lower):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = array("I", (key_id,))
+            else:
+                posting.append(key_id)
+
+        return key_id
+
+    @staticmethod
+    def _grams(text: str) -> set:
+        return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
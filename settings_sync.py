@@ -0,0 +1,52 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+FileSignature = Tuple[int, int, int]
+
+_MISSING = object()
+
+
+def file_signature(path: str) -> Optional[FileSignature]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size, st.st_ino
+
+
+def _same(a: Any, b: Any) -> bool:
+    return a is b or (type(a) is type(b) and a == b)
+
+
+class MergeResult:
+    def __init__(self):
+        self.updates: Dict[str, Any] = {}
+        self.added: List[str] = []
+        self.removals: List[str] = []
+        self.conflicts: List[str] = []
+
+    def __bool__(self) -> bool:
+        return bool(self.updates or self.removals)
+
+
+def three_way_merge(base: Dict[str, Any], ours: Dict[str, Any], theirs: Dict[str, Any]) -> MergeResult:
+    result = MergeResult()
+
+    for key in base.keys() | theirs.keys():
+        base_value = base.get(key, _MISSING)
+        their_value = theirs.get(key, _MISSING)
+        if _same(base_value, their_value):
+            continue
+
+        our_value = ours.get(key, _MISSING)
+        if _same(our_value, their_value):
+            continue
+
+        if not _same(our_value, base_value):
+            result.conflicts.append(key)
+        elif their_value is _MISSING:
+            result.removals.append(key)
+        else:
+            result.updates[key] = their_value
+
+    return result
@@ -0,0 +1,137 @@
+import os
+import shutil
+import time
+
+import pytest
+
+from fake_roblox import add_version, fake_local_app_data, write_settings
+from flag_model import get_settings_path
+from version_watcher import (
+    PLAYER_EXECUTABLE, VersionScanner, VersionWatcher, find_latest_player_version, get_versions_dir,
+)
+
+
+def touch(path: str, mtime: float):
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def local_app_data():
+    with fake_local_app_data("version-old", "version-new") as root:
+        yield root
+
+
+def version_path(root: str, name: str) -> str:
+    return os.path.join(root, "Roblox", "Versions", name)
+
+
+def test_versions_dir_needs_local_app_data(monkeypatch):
+    monkeypatch.delenv("LOCALAPPDATA", raising=False)
+    assert get_versions_dir() is None
+    assert find_latest_player_version(None) is None
+    assert VersionScanner(None).scan() is None
+
+
+def test_find_latest_picks_newest_folder_with_player(local_app_data):
+    versions_dir = get_versions_dir()
+    assert find_latest_player_version(versions_dir) == version_path(local_app_data, "version-new")
+
+    add_version(local_app_data, "version-studio", with_player=False, mtime=time.time() + 60)
+    assert find_latest_player_version(versions_dir) == version_path(local_app_data, "version-new")
+
+
+def test_scanner_detects_new_and_removed_versions(local_app_data):
+    versions_dir = get_versions_dir()
+    scanner = VersionScanner(versions_dir)
+    assert scanner.scan() == version_path(local_app_data, "version-new")
+
+    newest = add_version(local_app_data, "version-newest", mtime=time.time() + 60)
+    touch(versions_dir, time.time() + 60)
+    assert scanner.scan() == newest
+
+    shutil.rmtree(newest)
+    touch(versions_dir, time.time() + 120)
+    assert scanner.scan() == version_path(local_app_data, "version-new")
+
+
+def test_scanner_notices_player_installed_into_existing_folder(local_app_data):
+    versions_dir = get_versions_dir()
+    pending = add_version(local_app_data, "version-pending", with_player=False, mtime=time.time() + 60)
+    touch(versions_dir, time.time() + 60)
+    scanner = VersionScanner(versions_dir)
+    assert scanner.scan() == version_path(local_app_data, "version-new")
+
+    with open(os.path.join(pending, PLAYER_EXECUTABLE), "wb"):
+        pass
+    touch(pending, time.time() + 120)
+    assert scanner.scan() == pending
+
+
+def test_scanner_forgets_missing_versions_dir(local_app_data):
+    scanner = VersionScanner(get_versions_dir())
+    assert scanner.scan() is not None
+    shutil.rmtree(os.path.join(local_app_data, "Roblox"))
+    assert scanner.scan() is None
+    assert scanner.folders == {}
+
+
+def test_check_now_reports_each_new_latest_once(local_app_data):
+    calls = []
+    watcher = VersionWatcher(get_versions_dir(), on_change=lambda: calls.append(1))
+    watcher.check_now()
+    assert watcher.poll() == version_path(local_app_data, "version-new")
+
+    watcher.check_now()
+    assert watcher.poll() is None
+    assert len(calls) == 1
+
+    newest = add_version(local_app_data, "version-newest", mtime=time.time() + 60)
+    touch(get_versions_dir(), time.time() + 60)
+    watcher.check_now()
+    assert watcher.poll() == newest
+    assert len(calls) == 2
+
+
+def test_known_latest_is_not_reported(local_app_data):
+    watcher = VersionWatcher(get_versions_dir(), known_latest=version_path(local_app_data, "version-new"))
+    watcher.check_now()
+    assert watcher.poll() is None
+
+
+def test_polling_thread_picks_up_new_version(local_app_data):
+    watcher = VersionWatcher(get_versions_dir(), known_latest=version_path(local_app_data, "version-new"),
+                             poll_interval=0.01)
+    watcher.start()
+    try:
+        newest = add_version(local_app_data, "version-newest", mtime=time.time() + 60)
+        touch(get_versions_dir(), time.time() + 60)
+        deadline = time.time() + 5
+        latest = None
+        while latest is None and time.time() < deadline:
+            latest = watcher.poll()
+            time.sleep(0.01)
+        assert latest == newest
+    finally:
+        watcher.stop()
+    assert watcher._thread is None
+
+
+def test_watched_settings_file_change_is_reported(local_app_data):
+    latest = version_path(local_app_data, "version-new")
+    settings_path = get_settings_path(latest)
+    calls = []
+    watcher = VersionWatcher(get_versions_dir(), known_latest=latest, on_change=lambda: calls.append(1))
+    watcher.watch_file(settings_path)
+    watcher.check_now()
+    assert not watcher.poll_file_change()
+    assert calls == []
+
+    write_settings(latest, {"FFlagTest": True})
+    touch(settings_path, time.time() + 60)
+    watcher.check_now()
+    assert watcher.poll_file_change()
+    assert not watcher.poll_file_change()
+    assert calls == [1]
+
+    watcher.check_now()
+    assert not watcher.poll_file_change()
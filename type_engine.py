@@ -0,0 +1,71 @@
+import re
+from typing import Any, Dict, Optional, Tuple
+
+PREFIX_PATTERN = re.compile(r"[DS]?F(?:(?P<bool>Flag)|(?P<int>Int|Log)|(?P<string>String))")
+PREFIX_VALUE_CLASSES = {"bool": bool, "int": int}
+TYPE_NAMES = ("bool", "int", "string")
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+
+def prefix_type(name: str) -> Optional[str]:
+    match = PREFIX_PATTERN.match(name)
+    return match.lastgroup if match is not None else None
+
+
+def _is_int_text(value: str) -> bool:
+    return value.isdigit() or (value.startswith("-") and value[1:].isdigit())
+
+
+def deduce_type(value: Any) -> str:
+    if isinstance(value, bool): return "bool"
+    if isinstance(value, int): return "int"
+    if isinstance(value, str):
+        if value.lower() in ("true", "false"): return "bool"
+        if _is_int_text(value): return "int"
+    return "string"
+
+
+def coerce_value(value: Any) -> Any:
+    if isinstance(value, str):
+        if value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        if _is_int_text(value):
+            return int(value)
+    return value
+
+
+def coerce_flag(name: str, value: Any) -> Tuple[Any, str]:
+    expected = prefix_type(name)
+
+    if expected == "string":
+        return value, "string"
+    if expected == "bool":
+        if isinstance(value, bool):
+            return value, "bool"
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true", "bool"
+    elif expected == "int":
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value, "int"
+        if isinstance(value, str) and _is_int_text(value):
+            return int(value), "int"
+
+    value = coerce_value(value)
+    return value, deduce_type(value)
+
+
+def deduce_flag_type(name: str, value: Any) -> str:
+    return coerce_flag(name, value)[1]
+
+
+def deduce_flag_types(flags: Dict[str, Any]) -> Dict[str, str]:
+    match = PREFIX_PATTERN.match
+    types: Dict[str, str] = {}
+    for name, value in flags.items():
+        prefix = match(name)
+        expected = prefix.lastgroup if prefix is not None else None
+        if expected == "string" or (expected is not None and type(value) is PREFIX_VALUE_CLASSES[expected]):
+            types[name] = expected
+        else:
+            types[name] = deduce_flag_type(name, value)
+    return types
@@ -0,0 +1,86 @@
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+DEFAULT_MEMORY_LIMIT = 64 * 1024 * 1024
+ENTRY_COST = 256
+STATE_COST = 96
+
+FlagState = Optional[Tuple[Any, str]]
+
+
+def _state_cost(state: FlagState) -> int:
+    if state is None:
+        return 0
+    value = state[0]
+    return STATE_COST + (len(value) if isinstance(value, str) else 0)
+
+
+def _same_state(a: FlagState, b: FlagState) -> bool:
+    if a is None or b is None:
+        return a is b
+    return a[1] == b[1] and type(a[0]) is type(b[0]) and a[0] == b[0]
+
+
+class JournalEntry:
+    def __init__(self, label: str, before: Dict[str, FlagState], after: Dict[str, FlagState]):
+        self.label = label
+        self.before = before
+        self.after = after
+        self.size = ENTRY_COST + sum(
+            len(key) + _state_cost(state) + _state_cost(after[key]) for key, state in before.items()
+        )
+
+
+class UndoJournal:
+    def __init__(self, memory_limit: int = DEFAULT_MEMORY_LIMIT):
+        self.memory_limit = memory_limit
+        self.undo_entries: Deque[JournalEntry] = deque()
+        self.redo_entries: List[JournalEntry] = []
+        self.memory_used = 0
+        self.dropped: List[str] = []
+
+    def can_undo(self) -> bool:
+        return bool(self.undo_entries)
+
+    def can_redo(self) -> bool:
+        return bool(self.redo_entries)
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+        self.memory_used = 0
+
+    def record(self, label: str, before: Dict[str, FlagState], after: Dict[str, FlagState]):
+        changed = [key for key, state in before.items() if not _same_state(state, after[key])]
+        if not changed:
+            return
+        if len(changed) < len(before):
+            before = {key: before[key] for key in changed}
+            after = {key: after[key] for key in changed}
+
+        for entry in self.redo_entries:
+            self.memory_used -= entry.size
+        self.redo_entries.clear()
+
+        entry = JournalEntry(label, before, after)
+        if entry.size > self.memory_limit:
+            self.dropped.append(label)
+            return
+        self.undo_entries.append(entry)
+        self.memory_used += entry.size
+        while self.memory_used > self.memory_limit:
+            self.memory_used -= self.undo_entries.popleft().size
+
+    def undo(self) -> Optional[JournalEntry]:
+        if not self.undo_entries:
+            return None
+        entry = self.undo_entries.pop()
+        self.redo_entries.append(entry)
+        return entry
+
+    def redo(self) -> Optional[JournalEntry]:
+        if not self.redo_entries:
+            return None
+        entry = self.redo_entries.pop()
+        self.undo_entries.append(entry)
+        return entry
@@ -0,0 +1,204 @@
+import os
+import queue
+import threading
+import ctypes
+from typing import Callable, Dict, Optional, Tuple
+
+from settings_sync import FileSignature, file_signature
+
+PLAYER_EXECUTABLE = "RobloxPlayerBeta.exe"
+POLL_INTERVAL = 5.0
+
+FILE_NOTIFY_CHANGE_FILE_NAME = 0x01
+FILE_NOTIFY_CHANGE_DIR_NAME = 0x02
+FILE_NOTIFY_CHANGE_LAST_WRITE = 0x10
+INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+WAIT_OBJECT_0 = 0
+
+
+def get_versions_dir() -> Optional[str]:
+    local_app_data = os.environ.get("LOCALAPPDATA")
+    if not local_app_data:
+        return None
+    return os.path.join(local_app_data, "Roblox", "Versions")
+
+
+def find_latest_player_version(versions_dir: Optional[str]) -> Optional[str]:
+    try:
+        if not versions_dir or not os.path.exists(versions_dir):
+            return None
+
+        version_folders = [
+            os.path.join(versions_dir, d)
+            for d in os.listdir(versions_dir)
+            if os.path.isdir(os.path.join(versions_dir, d))
+        ]
+
+        version_folders.sort(key=os.path.getmtime, reverse=True)
+
+        for folder in version_folders:
+            if os.path.exists(os.path.join(folder, PLAYER_EXECUTABLE)):
+                return folder
+
+        return None
+
+    except Exception:
+        return None
+
+
+class VersionScanner:
+    def __init__(self, versions_dir: Optional[str]):
+        self.versions_dir = versions_dir
+        self.dir_mtime: Optional[int] = None
+        self.folders: Dict[str, Tuple[int, bool]] = {}
+
+    def scan(self) -> Optional[str]:
+        try:
+            dir_mtime = os.stat(self.versions_dir).st_mtime_ns
+        except (OSError, TypeError):
+            self.dir_mtime = None
+            self.folders = {}
+            return None
+
+        if dir_mtime != self.dir_mtime:
+            self.dir_mtime = dir_mtime
+            self._rescan_entries()
+        else:
+            self._refresh_folders()
+
+        latest_folder, latest_mtime = None, -1
+        for folder, (mtime, has_player) in self.folders.items():
+            if has_player and mtime > latest_mtime:
+                latest_folder, latest_mtime = folder, mtime
+        return latest_folder
+
+    def _rescan_entries(self):
+        folders = {}
+        try:
+            with os.scandir(self.versions_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        folders[entry.path] = self._stat_folder(entry.path)
+        except OSError:
+            pass
+        self.folders = {path: state for path, state in folders.items() if state is not None}
+
+    def _refresh_folders(self):
+        for folder, (mtime, has_player) in list(self.folders.items()):
+            state = self._stat_folder(folder, mtime, has_player)
+            if state is None:
+                del self.folders[folder]
+            else:
+                self.folders[folder] = state
+
+    @staticmethod
+    def _stat_folder(folder: str, cached_mtime: Optional[int] = None,
+                     cached_has_player: bool = False) -> Optional[Tuple[int, bool]]:
+        try:
+            mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return None
+        if mtime == cached_mtime:
+            return mtime, cached_has_player
+        return mtime, os.path.exists(os.path.join(folder, PLAYER_EXECUTABLE))
+
+
+class VersionWatcher:
+    def __init__(self, versions_dir: Optional[str], known_latest: Optional[str] = None,
+                 poll_interval: float = POLL_INTERVAL,
+                 on_change: Optional[Callable[[], None]] = None):
+        self.scanner = VersionScanner(versions_dir)
+        self.known_latest = known_latest
+        self.poll_interval = poll_interval
+        self.on_change = on_change
+        self.results: "queue.Queue[str]" = queue.Queue()
+        self.watched: Tuple[Optional[str], Optional[FileSignature]] = (None, None)
+        self._file_changed = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._handle = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="VersionWatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def poll(self) -> Optional[str]:
+        latest = None
+        while True:
+            try:
+                latest = self.results.get_nowait()
+            except queue.Empty:
+                return latest
+
+    def watch_file(self, path: Optional[str]):
+        self.watched = (path, file_signature(path) if path else None)
+        self._file_changed.clear()
+
+    def poll_file_change(self) -> bool:
+        if not self._file_changed.is_set():
+            return False
+        self._file_changed.clear()
+        return True
+
+    def check_now(self):
+        changed = False
+        latest = self.scanner.scan()
+        if latest and latest != self.known_latest:
+            self.known_latest = latest
+            self.results.put(latest)
+            changed = True
+
+        path, signature = watched = self.watched
+        if path:
+            current = file_signature(path)
+            if current != signature and self.watched is watched:
+                self.watched = (path, current)
+                self._file_changed.set()
+                changed = True
+
+        if changed and self.on_change:
+            self.on_change()
+
+    def _run(self):
+        wait = self._open_notification()
+        try:
+            while not self._stop_event.is_set():
+                self.check_now()
+                wait(self.poll_interval)
+        finally:
+            self._close_notification()
+
+    def _open_notification(self) -> Callable[[float], None]:
+        kernel32 = getattr(getattr(ctypes, "windll", None), "kernel32", None)
+        versions_dir = self.scanner.versions_dir
+        if kernel32 is None or not versions_dir or not os.path.isdir(versions_dir):
+            return self._stop_event.wait
+
+        kernel32.FindFirstChangeNotificationW.restype = ctypes.c_void_p
+        handle = kernel32.FindFirstChangeNotificationW(
+            versions_dir, True,
+            FILE_NOTIFY_CHANGE_FILE_NAME | FILE_NOTIFY_CHANGE_DIR_NAME | FILE_NOTIFY_CHANGE_LAST_WRITE,
+        )
+        if not handle or handle == INVALID_HANDLE_VALUE:
+            return self._stop_event.wait
+
+        self._handle = handle
+        self._kernel32 = kernel32
+
+        def wait(timeout: float):
+            if kernel32.WaitForSingleObject(ctypes.c_void_p(handle), int(timeout * 1000)) == WAIT_OBJECT_0:
+                kernel32.FindNextChangeNotification(ctypes.c_void_p(handle))
+
+        return wait
+
+    def _close_notification(self):
+        if self._handle is not None:
+            self._kernel32.FindCloseChangeNotification(ctypes.c_void_p(self._handle))
+            self._handle = None